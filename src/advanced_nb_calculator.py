@@ -5,19 +5,34 @@ JavaScript bitCalculation.v.0.2.js를 Python으로 변환
 """
 
 import math
-from typing import List, Dict, Tuple, Any
+import os
+import re
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from collections import Counter
 
+try:
+    import numpy as np
+except ImportError:  # numpy는 선택 사항
+    np = None
+
 # 전역 변수
 SUPER_BIT = 0.0
 
+# 문장 비교용 정규식 (모듈 로드 시 한 번만 컴파일)
+_SENTENCE_STRIP_PATTERN = re.compile(r'[^\w가-힣\s]', flags=re.UNICODE)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
 
 def initialize_arrays(count: int) -> Dict[str, List[float]]:
     """주어진 배열들을 초기화하는 함수"""
     arrays = ['BIT_START_A50', 'BIT_START_A100', 'BIT_START_B50', 'BIT_START_B100', 'BIT_START_NBA100']
     initialized_arrays = {}
-    for array in arrays:
-        initialized_arrays[array] = [0.0] * count
+    for name in arrays:
+        initialized_arrays[name] = [0.0] * count
     return initialized_arrays
 
 
@@ -98,28 +113,433 @@ def update_super_bit(new_value: float):
     SUPER_BIT = new_value
 
 
-def BIT_MAX_NB(nb: List[float], bit: float = 5.5) -> float:
-    """시간 순방향 상한치 분석"""
-    result = calculate_bit(nb, bit, False)  # 시간 정방향 분석
-
-    # 결과 값이 유효 범위를 벗어나면 SUPER_BIT 반환
+def _apply_super_bit(result: float) -> float:
+    """유효 범위(-100~100)를 벗어나거나 유한하지 않은 결과는 직전 유효값(SUPER_BIT)으로 대체"""
     if not math.isfinite(result) or math.isnan(result) or result > 100 or result < -100:
         return SUPER_BIT
-    else:
-        update_super_bit(result)
-        return result
+    update_super_bit(result)
+    return result
+
+
+def BIT_MAX_NB(nb: List[float], bit: float = 5.5) -> float:
+    """시간 순방향 상한치 분석 (선택된 n/b 엔진 사용)"""
+    return _apply_super_bit(get_engine().calculate_bit(nb, bit, False))  # 시간 정방향 분석
 
 
 def BIT_MIN_NB(nb: List[float], bit: float = 5.5) -> float:
-    """시간 순방향 하한치 분석"""
-    result = calculate_bit(nb, bit, True)  # 시간 역방향 분석
+    """시간 순방향 하한치 분석 (선택된 n/b 엔진 사용)"""
+    return _apply_super_bit(get_engine().calculate_bit(nb, bit, True))  # 시간 역방향 분석
 
-    # 결과 값이 유효 범위를 벗어나면 SUPER_BIT 반환
-    if not math.isfinite(result) or math.isnan(result) or result > 100 or result < -100:
-        return SUPER_BIT
-    else:
-        update_super_bit(result)
-        return result
+
+def bit_max_min_batch(arrays: List[List[float]], bit: float = 5.5) -> List[Tuple[float, float]]:
+    """여러 배열의 (BIT_MAX_NB, BIT_MIN_NB)를 순서대로 계산 (선택된 n/b 엔진 사용)"""
+    return get_engine().bit_max_min_batch(arrays, bit)
+
+
+# ---------------------------------------------------------------------------
+# n/b 엔진
+#
+# calculate_bit은 배열 길이 n에 대해 150 * n개의 구간 [B50, B100]을 만들고, 각 값이
+# 처음으로 들어가는 구간의 NBA100을 더한다. 구간 경계는 값의 부호가 같은 블록
+# (150개) 안에서 단조 증가하므로 선형 탐색 대신 이분 탐색으로 같은 구간을 찾을 수
+# 있다. 모든 엔진은 기준 구현과 같은 순서로 부동소수점 연산을 하므로 결과가 비트
+# 단위까지 같다 (src/nb_equivalence.py로 검증).
+#
+# 엔진 선택: set_engine(이름) 또는 환경 변수 NB_ENGINE (기본값 reference)
+# ---------------------------------------------------------------------------
+
+NB_ENGINE_ENV = 'NB_ENGINE'
+DEFAULT_ENGINE = 'reference'
+FALLBACK_ENGINE = 'bisect'  # numpy가 없을 때 대신 쓰는 순수 파이썬 엔진
+_BIT_COUNT = 150  # calculate_bit의 COUNT
+
+
+class NBEngine:
+    """n/b 계산 엔진 인터페이스 (기본 구현은 기준 calculate_bit)"""
+
+    name = 'reference'
+
+    def calculate_bit(self, nb: List[float], bit: float = 5.5, reverse: bool = False) -> float:
+        return calculate_bit(nb, bit, reverse)
+
+    def bit_max_min_batch(self, arrays: List[List[float]], bit: float = 5.5) -> List[Tuple[float, float]]:
+        """BIT_MAX_NB/BIT_MIN_NB와 같은 SUPER_BIT 규칙으로 (max, min) 목록 계산"""
+        results = []
+        for nb in arrays:
+            nb_max = _apply_super_bit(self.calculate_bit(nb, bit, False))
+            nb_min = _apply_super_bit(self.calculate_bit(nb, bit, True))
+            results.append((nb_max, nb_min))
+        return results
+
+
+def _bit_increments(nb: List[float]) -> Tuple[Any, float, float]:
+    """calculate_bit과 같은 식으로 (min_val, 음수 증분, 양수 증분) 계산"""
+    max_val = max(nb)
+    min_val = min(nb)
+    total = _BIT_COUNT * len(nb)
+    negative_range = abs(min_val) if min_val < 0 else 0
+    positive_range = max_val if max_val > 0 else 0
+    return min_val, negative_range / (total - 1), positive_range / (total - 1)
+
+
+def _nba100(index: int, bit: float, total: int, length: int) -> float:
+    """calculate_bit의 BIT_START_NBA100[index]와 같은 값"""
+    return (index + 1) * bit / total / (length - 1)
+
+
+def _first_interval(value, min_val, increment: float, lo: int, hi: int) -> int:
+    """[lo, hi) 중 B50 <= value <= B100인 첫 인덱스 (없으면 -1)
+
+    한 블록 안에서 B50, B100은 단조 증가하므로 B100 >= value인 첫 인덱스만 확인하면 된다.
+    """
+    end = hi
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if min_val + increment * (mid + 1) + increment < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < end:
+        a50 = min_val + increment * (lo + 1)
+        if a50 - increment * 2 <= value <= a50 + increment:
+            return lo
+    return -1
+
+
+def _single_block(nb: List[float], negative_increment: float, positive_increment: float) -> bool:
+    """모든 값이 같은 증분을 쓰면 전체 구간이 하나의 단조 블록이 된다"""
+    return negative_increment == positive_increment or all(value < 0 for value in nb) or all(value >= 0 for value in nb)
+
+
+class BisectEngine(NBEngine):
+    """구간 배열을 만들지 않고 이분 탐색으로 NB50을 계산하는 순수 파이썬 엔진 (O(n log n))"""
+
+    name = 'bisect'
+
+    def calculate_bit(self, nb: List[float], bit: float = 5.5, reverse: bool = False) -> float:
+        length = len(nb)
+        if length < 2:
+            return bit / 100
+        min_val, negative_increment, positive_increment = _bit_increments(nb)
+        if not (math.isfinite(min_val) and math.isfinite(negative_increment) and math.isfinite(positive_increment)):
+            # NaN/inf가 섞이면 구간이 단조롭지 않으므로 기준 구현 사용
+            return calculate_bit(nb, bit, reverse)
+
+        total = _BIT_COUNT * length
+        if _single_block(nb, negative_increment, positive_increment):
+            increment = negative_increment if nb[0] < 0 else positive_increment
+            blocks = [(0, total, increment)]
+        else:
+            blocks = [
+                (start, start + _BIT_COUNT, negative_increment if value < 0 else positive_increment)
+                for start, value in zip(range(0, total, _BIT_COUNT), nb)
+            ]
+
+        NB50 = 0
+        for value in nb:
+            for lo, hi, increment in blocks:
+                index = _first_interval(value, min_val, increment, lo, hi)
+                if index >= 0:
+                    NB50 += _nba100(total - 1 - index if reverse else index, bit, total, length)
+                    break
+
+        if length == 2:
+            return bit - NB50
+        return NB50
+
+
+class NumpyEngine(NBEngine):
+    """구간 경계를 numpy 배열로 만들고 np.searchsorted로 찾는 엔진"""
+
+    name = 'numpy'
+
+    def __init__(self) -> None:
+        if np is None:
+            raise ImportError("numpy가 설치되어 있지 않습니다")
+
+    def calculate_bit(self, nb: List[float], bit: float = 5.5, reverse: bool = False) -> float:
+        length = len(nb)
+        if length < 2:
+            return bit / 100
+        min_val, negative_increment, positive_increment = _bit_increments(nb)
+        if not (math.isfinite(min_val) and math.isfinite(negative_increment) and math.isfinite(positive_increment)):
+            return calculate_bit(nb, bit, reverse)
+
+        total = _BIT_COUNT * length
+        values = np.asarray(nb, dtype=np.float64)
+        negative = values < 0
+        increments = np.repeat(np.where(negative, negative_increment, positive_increment), _BIT_COUNT)
+        a50 = min_val + increments * np.arange(1, total + 1, dtype=np.float64)
+        b50 = a50 - increments * 2
+        b100 = a50 + increments
+
+        if _single_block(nb, negative_increment, positive_increment):
+            bounds = [(0, total)]
+        else:
+            bounds = [(start, start + _BIT_COUNT) for start in range(0, total, _BIT_COUNT)]
+        found = np.full(length, -1, dtype=np.int64)
+        for lo, hi in bounds:
+            pending = found < 0
+            if not pending.any():
+                break
+            candidates = np.searchsorted(b100[lo:hi], values[pending], side='left') + lo
+            clipped = np.minimum(candidates, hi - 1)
+            pending_values = values[pending]
+            hit = (candidates < hi) & (b50[clipped] <= pending_values) & (pending_values <= b100[clipped])
+            found[np.flatnonzero(pending)[hit]] = candidates[hit]
+
+        indexes = found[found >= 0]
+        if reverse:
+            indexes = total - 1 - indexes
+        # 기준 구현처럼 값 순서대로 하나씩 더한다 (np.sum은 합산 순서가 달라 결과가 달라질 수 있음)
+        NB50 = 0
+        for contribution in ((indexes + 1) * bit / total / (length - 1)).tolist():
+            NB50 += contribution
+
+        if length == 2:
+            return bit - NB50
+        return NB50
+
+    def bit_max_min_batch(self, arrays: List[List[float]], bit: float = 5.5) -> List[Tuple[float, float]]:
+        nb_max, nb_min = bit_max_min_vectors(arrays, bit)
+        return list(zip(nb_max.tolist(), nb_min.tolist()))
+
+
+# 배치 커널: 길이순으로 정렬한 단어 묶음을 (단어 수 x 최대 길이) 배열로 채워 한 번에 계산
+_BATCH_CHUNK = 512
+
+
+def _calculate_bit_padded(values: Any, lengths: Any, bit: float) -> Tuple[Any, Any]:
+    """패딩된 (words x max_len) 배열에서 단어별 정방향/역방향 calculate_bit 결과
+
+    모든 단어는 길이 2 이상이고 값이 유한하며 하나의 단조 블록이어야 한다.
+    구간 경계 B100(a) = min + inc * (a + 1) + inc는 인덱스의 함수이므로 (words x 150 * max_len)
+    경계 배열을 만들지 않고 모든 값에 대해 동시에 이분 탐색한다.
+    """
+    words, width = values.shape
+    mask = np.arange(width) < lengths[:, None]
+    totals = _BIT_COUNT * lengths
+    min_val = np.where(mask, values, np.inf).min(axis=1)
+    max_val = np.where(mask, values, -np.inf).max(axis=1)
+    negative_increment = np.where(min_val < 0, np.abs(min_val), 0.0) / (totals - 1)
+    positive_increment = np.where(max_val > 0, max_val, 0.0) / (totals - 1)
+    all_negative = ~(mask & (values >= 0)).any(axis=1)
+    increment = np.where(all_negative, negative_increment, positive_increment)[:, None]
+    low = min_val[:, None]
+
+    lo = np.zeros((words, width), dtype=np.int64)
+    hi = np.broadcast_to(totals[:, None], (words, width)).copy()
+    for _ in range(int(totals.max()).bit_length()):
+        mid = (lo + hi) // 2
+        right = low + increment * (mid + 1) + increment < values
+        active = lo < hi
+        lo = np.where(active & right, mid + 1, lo)
+        hi = np.where(active & ~right, mid, hi)
+
+    a50 = low + increment * (lo + 1)
+    hit = mask & (lo < totals[:, None]) & (a50 - increment * 2 <= values) & (values <= a50 + increment)
+    scale = (lengths - 1)[:, None]
+    forward_part = (lo + 1) * bit / totals[:, None] / scale
+    reverse_part = (totals[:, None] - lo) * bit / totals[:, None] / scale
+
+    # 기준 구현과 같은 순서(값 순서)로 더해야 결과가 같다
+    forward = np.zeros(words)
+    reverse = np.zeros(words)
+    for column in range(width):
+        taken = hit[:, column]
+        forward = np.where(taken, forward + forward_part[:, column], forward)
+        reverse = np.where(taken, reverse + reverse_part[:, column], reverse)
+
+    pair = lengths == 2
+    forward = np.where(pair, bit - forward, forward)
+    reverse = np.where(pair, bit - reverse, reverse)
+    return forward, reverse
+
+
+def calculate_bit_batch(arrays: List[List[float]], bit: float = 5.5) -> Tuple[Any, Any]:
+    """여러 코드 배열의 calculate_bit(정방향, 역방향) 결과를 numpy 배열로 계산
+
+    기준 구현과 비트 단위까지 같다. 부호가 섞이거나 NaN/inf가 있는 배열은 단어별 NumpyEngine으로 계산한다.
+    """
+    if np is None:
+        raise ImportError("numpy가 설치되어 있지 않습니다")
+    count = len(arrays)
+    forward = np.empty(count)
+    reverse = np.empty(count)
+    lengths = np.fromiter((len(nb) for nb in arrays), dtype=np.int64, count=count)
+
+    batched = []
+    fallback = NumpyEngine()
+    for index, nb in enumerate(arrays):
+        if len(nb) < 2:
+            forward[index] = reverse[index] = bit / 100
+            continue
+        min_val, negative_increment, positive_increment = _bit_increments(nb)
+        if (
+            math.isfinite(min_val)
+            and math.isfinite(negative_increment)
+            and math.isfinite(positive_increment)
+            and _single_block(nb, negative_increment, positive_increment)
+        ):
+            batched.append(index)
+        else:
+            forward[index] = fallback.calculate_bit(nb, bit, False)
+            reverse[index] = fallback.calculate_bit(nb, bit, True)
+
+    # 길이순으로 묶어 패딩을 줄인다
+    batched.sort(key=lambda index: lengths[index])
+    for start in range(0, len(batched), _BATCH_CHUNK):
+        chunk = batched[start:start + _BATCH_CHUNK]
+        chunk_lengths = lengths[chunk]
+        padded = np.zeros((len(chunk), int(chunk_lengths.max())))
+        for row, index in enumerate(chunk):
+            padded[row, :chunk_lengths[row]] = arrays[index]
+        forward[chunk], reverse[chunk] = _calculate_bit_padded(padded, chunk_lengths, bit)
+    return forward, reverse
+
+
+def bit_max_min_vectors(arrays: List[List[float]], bit: float = 5.5) -> Tuple[Any, Any]:
+    """배치 커널로 계산한 (BIT_MAX_NB, BIT_MIN_NB) 벡터 (SUPER_BIT 규칙을 순서대로 적용)"""
+    forward, reverse = calculate_bit_batch(arrays, bit)
+    nb_max = np.empty(len(arrays))
+    nb_min = np.empty(len(arrays))
+    for index, (max_raw, min_raw) in enumerate(zip(forward.tolist(), reverse.tolist())):
+        nb_max[index] = _apply_super_bit(max_raw)
+        nb_min[index] = _apply_super_bit(min_raw)
+    return nb_max, nb_min
+
+
+class CachedEngine(NBEngine):
+    """같은 코드 배열의 결과를 기억하는 엔진 (반복 단어가 많은 말뭉치용)"""
+
+    name = 'cached'
+
+    def __init__(self, base: Optional[NBEngine] = None, maxsize: int = 65536) -> None:
+        self.base = base or BisectEngine()
+        self._cached = lru_cache(maxsize=maxsize)(self._calculate)
+
+    def _calculate(self, codes: Tuple, bit: float, reverse: bool) -> float:
+        return self.base.calculate_bit(list(codes), bit, reverse)
+
+    def calculate_bit(self, nb: List[float], bit: float = 5.5, reverse: bool = False) -> float:
+        return self._cached(tuple(nb), bit, reverse)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+
+
+_ENGINE_FACTORIES: Dict[str, Callable[[], NBEngine]] = {
+    'reference': NBEngine,
+    'bisect': BisectEngine,
+    'numpy': NumpyEngine,
+    'cached': CachedEngine,
+}
+_active_engine: Optional[NBEngine] = None
+
+
+def register_engine(name: str, factory: Callable[[], NBEngine]) -> None:
+    """새 n/b 엔진 등록 (factory는 의존성이 없으면 ImportError를 낸다)"""
+    _ENGINE_FACTORIES[name] = factory
+
+
+def engine_names() -> List[str]:
+    return list(_ENGINE_FACTORIES)
+
+
+def create_engine(name: str) -> NBEngine:
+    if name not in _ENGINE_FACTORIES:
+        raise ValueError(f"알 수 없는 n/b 엔진: {name} (사용 가능: {', '.join(_ENGINE_FACTORIES)})")
+    return _ENGINE_FACTORIES[name]()
+
+
+def set_engine(name: Optional[str] = None) -> NBEngine:
+    """n/b 엔진 선택 (None이면 환경 변수 NB_ENGINE, 없으면 기본값)
+
+    numpy 엔진처럼 의존성이 없는 엔진을 고르면 경고 후 FALLBACK_ENGINE을 쓴다.
+    이름을 직접 넘겼는데 등록되지 않은 엔진이면 ValueError, 환경 변수 값이
+    잘못되었으면 경고 후 DEFAULT_ENGINE을 쓴다 (import 중 첫 계산에서 실패하지 않도록).
+    """
+    global _active_engine
+    if not name:
+        name = os.getenv(NB_ENGINE_ENV, '').strip() or DEFAULT_ENGINE
+        if name not in _ENGINE_FACTORIES:
+            print(f"경고: {NB_ENGINE_ENV}={name}은(는) 알 수 없는 n/b 엔진이라 '{DEFAULT_ENGINE}' 엔진을 사용합니다 "
+                  f"(사용 가능: {', '.join(_ENGINE_FACTORIES)})")
+            name = DEFAULT_ENGINE
+    try:
+        engine = create_engine(name)
+    except ImportError as exc:
+        print(f"경고: n/b 엔진 '{name}'을(를) 사용할 수 없어 '{FALLBACK_ENGINE}' 엔진을 사용합니다 ({exc})")
+        engine = create_engine(FALLBACK_ENGINE)
+    _active_engine = engine
+    return engine
+
+
+def get_engine() -> NBEngine:
+    """현재 n/b 엔진 (처음 호출 시 환경 변수로 선택)"""
+    if _active_engine is None:
+        return set_engine()
+    return _active_engine
+
+
+def _longest_common_run(nb1: List, nb2: List) -> int:
+    """두 배열에서 가장 긴 연속 일치 구간의 길이 (접미사 오토마톤, O(n + m))"""
+    if not nb1 or not nb2:
+        return 0
+
+    # nb2로 접미사 오토마톤 구성
+    transitions: List[Dict[Any, int]] = [{}]
+    links = [-1]
+    lengths = [0]
+    last = 0
+
+    for value in nb2:
+        current = len(lengths)
+        transitions.append({})
+        links.append(0)
+        lengths.append(lengths[last] + 1)
+
+        state = last
+        while state != -1 and value not in transitions[state]:
+            transitions[state][value] = current
+            state = links[state]
+
+        if state != -1:
+            target = transitions[state][value]
+            if lengths[state] + 1 == lengths[target]:
+                links[current] = target
+            else:
+                clone = len(lengths)
+                transitions.append(dict(transitions[target]))
+                links.append(links[target])
+                lengths.append(lengths[state] + 1)
+                while state != -1 and transitions[state].get(value) == target:
+                    transitions[state][value] = clone
+                    state = links[state]
+                links[target] = clone
+                links[current] = clone
+        last = current
+
+    # nb1을 오토마톤 위로 진행시키며 최장 일치 길이 추적
+    state = 0
+    run = 0
+    best = 0
+    for value in nb1:
+        while state and value not in transitions[state]:
+            state = links[state]
+            run = lengths[state]
+        if value in transitions[state]:
+            state = transitions[state][value]
+            run += 1
+            if run > best:
+                best = run
+        else:
+            run = 0
+
+    return best
 
 
 def calculate_array_order_and_duplicate(nb1: List, nb2: List) -> Dict[str, float]:
@@ -140,20 +560,8 @@ def calculate_array_order_and_duplicate(nb1: List, nb2: List) -> Dict[str, float
         if key in element_count2 and element_count1[key] >= 1 and element_count2[key] >= 1:
             duplicate_match += min(element_count1[key], element_count2[key])
 
-    # 두 배열의 순서 및 중복 비교
-    for i in range(length1):
-        for j in range(length2):
-            if nb1[i] == nb2[j]:
-                temp_match = 0
-                x, y = i, j
-
-                while x < length1 and y < length2 and nb1[x] == nb2[y]:
-                    temp_match += 1
-                    x += 1
-                    y += 1
-
-                if temp_match > max_order_match:
-                    max_order_match = temp_match
+    # 두 배열의 순서 비교 (가장 긴 연속 일치 구간)
+    max_order_match = _longest_common_run(nb1, nb2)
 
     order_match = max_order_match
 
@@ -183,27 +591,16 @@ def calculate_array_order_and_duplicate(nb1: List, nb2: List) -> Dict[str, float
     }
 
 
-def calculate_inclusion_from_base(sentence1: str, sentence2: str) -> Dict[str, Any]:
-    """기준 문장(sentence1)의 단어들이 비교 문장(sentence2)에 얼마나 포함되어 있는지 계산"""
-    if not sentence1 or not sentence2:
-        return {'matched': 0, 'total': 0, 'ratio': 0.0, 'matchedWords': []}
-
-    import re
+def _clean_sentence_words(sentence: str) -> List[str]:
+    """특수문자 제거 및 공백 정리 후 단어 목록 반환"""
+    s = _SENTENCE_STRIP_PATTERN.sub('', sentence)
+    s = _WHITESPACE_PATTERN.sub(' ', s)
+    return s.strip().split(' ')
 
-    def clean(s):
-        # 특수문자 제거, 공백 정리
-        s = re.sub(r'[^\w가-힣\s]', '', s, flags=re.UNICODE)
-        s = re.sub(r'\s+', ' ', s)
-        return s.strip()
 
-    base_words = clean(sentence1).split(' ')
-    compare_words = clean(sentence2).split(' ')
-
-    matched_words = []
-
-    for word in base_words:
-        if word in compare_words:
-            matched_words.append(word)
+def _inclusion_result(base_words: List[str], compare_set: set) -> Dict[str, Any]:
+    """기준 단어 목록과 비교 단어 집합으로 포함 결과 생성"""
+    matched_words = [word for word in base_words if word in compare_set]
 
     match_count = len(matched_words)
     ratio = (match_count / len(base_words)) * 100 if len(base_words) > 0 else 0
@@ -216,6 +613,33 @@ def calculate_inclusion_from_base(sentence1: str, sentence2: str) -> Dict[str, A
     }
 
 
+def calculate_inclusion_from_base(sentence1: str, sentence2: str) -> Dict[str, Any]:
+    """기준 문장(sentence1)의 단어들이 비교 문장(sentence2)에 얼마나 포함되어 있는지 계산"""
+    if not sentence1 or not sentence2:
+        return {'matched': 0, 'total': 0, 'ratio': 0.0, 'matchedWords': []}
+
+    base_words = _clean_sentence_words(sentence1)
+    compare_set = set(_clean_sentence_words(sentence2))
+
+    return _inclusion_result(base_words, compare_set)
+
+
+def calculate_inclusion_from_base_batch(sentence1: str, sentences: List[str]) -> List[Dict[str, Any]]:
+    """하나의 기준 문장을 여러 비교 문장과 비교 (기준 문장은 한 번만 정리)"""
+    if not sentence1:
+        return [calculate_inclusion_from_base(sentence1, sentence2) for sentence2 in sentences]
+
+    base_words = _clean_sentence_words(sentence1)
+
+    results = []
+    for sentence2 in sentences:
+        if not sentence2:
+            results.append(calculate_inclusion_from_base(sentence1, sentence2))
+        else:
+            results.append(_inclusion_result(base_words, set(_clean_sentence_words(sentence2))))
+    return results
+
+
 def levenshtein(a: str, b: str) -> int:
     """Levenshtein 거리 계산 함수"""
     matrix = [[0] * (len(a) + 1) for _ in range(len(b) + 1)]
@@ -258,57 +682,65 @@ def calculate_levenshtein_similarity(nb1: List[str], nb2: List[str]) -> float:
     return total_similarity / len(nb1) if len(nb1) > 0 else 0
 
 
+# SOUNDEX 코드 변환표 (코드가 없는 문자와 원래 숫자는 제거)
+_SOUNDEX_TABLE = str.maketrans(
+    'bfpvcgjkqsxzdtlmnr',
+    '111122222222334556',
+    '0123456789'
+)
+_SOUNDEX_NON_CODE_PATTERN = re.compile(r'[^1-6]+')
+
+
+@lru_cache(maxsize=65536)
+def _soundex_code(s: str) -> str:
+    """문자열 하나의 SOUNDEX 코드 (결과 캐시)"""
+    s = s.lower()
+    if len(s) == 0:
+        return "0000"
+
+    # 코드 문자만 남긴 뒤 연속된 같은 코드를 하나로 합친다
+    digits = _SOUNDEX_NON_CODE_PATTERN.sub('', s[1:].translate(_SOUNDEX_TABLE))
+    r = ''.join(code for code, _ in groupby(digits))
+
+    result = s[0] + r + '000'
+    return result[:4].upper()
+
+
 def soundex(s: str) -> str:
     """SOUNDEX 함수 (문자열을 발음 코드로 변환)"""
     if not isinstance(s, str):
         s = str(s)
+    return _soundex_code(s)
 
-    s = s.lower()
-    if len(s) == 0:
-        return "0000"
 
-    a = list(s)
-    f = a.pop(0)
-
-    def get_code(c):
-        if c in 'bfpv':
-            return '1'
-        elif c in 'cgjkqsxz':
-            return '2'
-        elif c in 'dt':
-            return '3'
-        elif c in 'l':
-            return '4'
-        elif c in 'mn':
-            return '5'
-        elif c in 'r':
-            return '6'
-        else:
-            return ''
+def _soundex_counter(nb: List) -> Counter:
+    """배열 원소별 SOUNDEX 코드의 다중집합"""
+    return Counter(_soundex_code(str(value)) for value in nb)
 
-    r = []
-    prev = ''
-    for c in a:
-        code = get_code(c)
-        if code and code != prev:
-            r.append(code)
-            prev = code
 
-    result = f + ''.join(r) + '000'
-    return result[:4].upper()
+def _soundex_match_ratio(counter1: Counter, length1: int, counter2: Counter, length2: int) -> float:
+    """두 SOUNDEX 다중집합의 일치 쌍 수로 비율 계산"""
+    # 같은 코드끼리의 모든 (i, j) 쌍 수 = 코드별 개수의 곱
+    if len(counter2) < len(counter1):
+        counter1, counter2 = counter2, counter1
+    soundex_match = sum(count * counter2[code] for code, count in counter1.items() if code in counter2)
+
+    min_length = min(length1, length2)
+    return (soundex_match / min_length) * 100 if min_length > 0 else 0
 
 
 def calculate_soundex_match(nb1: List, nb2: List) -> float:
     """SOUNDEX 기반 유사도 계산 함수"""
-    soundex_match = 0
+    return _soundex_match_ratio(_soundex_counter(nb1), len(nb1), _soundex_counter(nb2), len(nb2))
 
-    for i in range(len(nb1)):
-        for j in range(len(nb2)):
-            if soundex(str(nb1[i])) == soundex(str(nb2[j])):
-                soundex_match += 1
 
-    soundex_match_ratio = (soundex_match / min(len(nb1), len(nb2))) * 100 if min(len(nb1), len(nb2)) > 0 else 0
-    return soundex_match_ratio
+def calculate_soundex_match_batch(nb1: List, candidates: List[List]) -> List[float]:
+    """하나의 기준 배열을 여러 후보 배열과 SOUNDEX 비교 (원소별 코드는 한 번만 계산)"""
+    counter1 = _soundex_counter(nb1)
+    return [
+        _soundex_match_ratio(counter1, len(nb1), _soundex_counter(nb2), len(nb2))
+        for nb2 in candidates
+    ]
 
 
 def word_sim(nb_max: float = 100, nb_min: float = 50, max_val: float = 100, min_val: float = 50) -> float:
@@ -352,123 +784,168 @@ def word_sim2(nb_max: float = 100, max_val: float = 100) -> float:
     return abs(sim_max)
 
 
-def calculate_array_similarity(array1: List, array2: List) -> float:
-    """배열 유사도 계산 (Jaccard + 순서 고려)"""
-    # 기존 교집합/합집합 기반 유사도 계산
-    intersection = [value for value in array1 if value in array2]
-    union = list(set(array1 + array2))
-    jaccard_similarity = (len(intersection) / len(union)) * 100 if len(union) > 0 else 0
+def _array_similarity_from_sets(array1: List, set1: set, array2: List, set2: set) -> float:
+    """미리 계산한 집합으로 배열 유사도 계산"""
+    # 교집합/합집합 기반 유사도 계산 (array1의 중복 원소는 각각 센다)
+    intersection_count = sum(1 for value in array1 if value in set2)
+    union_count = len(set1 | set2)
+    jaccard_similarity = (intersection_count / union_count) * 100 if union_count > 0 else 0
 
     # 순서를 고려한 유사도 계산
-    ordered_matches = [array1[i] for i in range(min(len(array1), len(array2))) if i < len(array2) and array1[i] == array2[i]]
     ordered_similarity = 0
     if len(array1) > 0 and len(array1) == len(array2):
-        ordered_similarity = (len(ordered_matches) / len(array1)) * 100
+        ordered_count = sum(1 for a, b in zip(array1, array2) if a == b)
+        ordered_similarity = (ordered_count / len(array1)) * 100
 
     # 두 유사도를 결합하여 최종 유사도 계산
     return (jaccard_similarity * 0.5) + (ordered_similarity * 0.5)
 
 
-def word_nb_unicode_format(domain: str) -> List[int]:
-    """유니코드 기반 언어별 prefix 적용"""
-    default_prefix = '한 국 어 영 어 중 국 어 . 일 본 어'
+def calculate_array_similarity(array1: List, array2: List) -> float:
+    """배열 유사도 계산 (Jaccard + 순서 고려)"""
+    return _array_similarity_from_sets(array1, set(array1), array2, set(array2))
+
+
+def calculate_array_similarity_batch(array1: List, candidates: List[List]) -> List[float]:
+    """하나의 기준 배열을 여러 후보 배열과 비교 (기준 집합은 한 번만 계산)"""
+    set1 = set(array1)
+    return [_array_similarity_from_sets(array1, set1, array2, set(array2)) for array2 in candidates]
+
+
+# 유니코드 범위별 언어 prefix (시작 코드포인트 기준 정렬)
+_UNICODE_PREFIX_RANGES = sorted([
+    (0xAC00, 0xD7AF, 1000000),  # Korean
+    (0x3040, 0x309F, 2000000),  # Japanese Hiragana
+    (0x30A0, 0x30FF, 3000000),  # Japanese Katakana
+    (0x4E00, 0x9FFF, 4000000),  # Chinese
+    (0x0410, 0x044F, 5000000),  # Russian
+    (0x0041, 0x007A, 6000000),  # English (basic Latin)
+    (0x0590, 0x05FF, 7000000),  # Hebrew
+    (0x00C0, 0x00FD, 8000000),  # Vietnamese
+    (0x0E00, 0x0E7F, 9000000),  # Thai
+])
+_UNICODE_PREFIX_STARTS = [low for low, _, _ in _UNICODE_PREFIX_RANGES]
+
+_DEFAULT_UNICODE_PREFIX = '한 국 어 영 어 중 국 어 . 일 본 어'
+
+
+def _unicode_code(unicode_value: int) -> int:
+    """코드포인트에 언어 prefix를 더한 값"""
+    idx = bisect_right(_UNICODE_PREFIX_STARTS, unicode_value) - 1
+    if idx >= 0:
+        _, high, prefix = _UNICODE_PREFIX_RANGES[idx]
+        if unicode_value <= high:
+            return prefix + unicode_value
+    return unicode_value
+
 
+# 모든 단어 앞에 붙는 기본 prefix 부분은 한 번만 계산
+_DEFAULT_PREFIX_CODES = tuple(_unicode_code(ord(char)) for char in _DEFAULT_UNICODE_PREFIX)
+_DEFAULT_PREFIX_CODES_WITH_SEP = _DEFAULT_PREFIX_CODES + (_unicode_code(ord(':')),)
+
+
+def word_nb_unicode_format(domain: str, output: str = 'list') -> Any:
+    """유니코드 기반 언어별 prefix 적용
+
+    output: 'list' (기본값), 'array' (array('i')), 'numpy' (numpy int32 배열)
+    """
     if not domain or len(domain) == 0:
-        domain = default_prefix
+        result = list(_DEFAULT_PREFIX_CODES)
     else:
-        domain = default_prefix + ':' + domain
-
-    chars = list(domain)
-
-    lang_ranges = [
-        {'range': (0xAC00, 0xD7AF), 'prefix': 1000000},  # Korean
-        {'range': (0x3040, 0x309F), 'prefix': 2000000},  # Japanese Hiragana
-        {'range': (0x30A0, 0x30FF), 'prefix': 3000000},  # Japanese Katakana
-        {'range': (0x4E00, 0x9FFF), 'prefix': 4000000},  # Chinese
-        {'range': (0x0410, 0x044F), 'prefix': 5000000},  # Russian
-        {'range': (0x0041, 0x007A), 'prefix': 6000000},  # English (basic Latin)
-        {'range': (0x0590, 0x05FF), 'prefix': 7000000},  # Hebrew
-        {'range': (0x00C0, 0x00FD), 'prefix': 8000000},  # Vietnamese
-        {'range': (0x0E00, 0x0E7F), 'prefix': 9000000},  # Thai
+        result = list(_DEFAULT_PREFIX_CODES_WITH_SEP)
+        result.extend([_unicode_code(ord(char)) for char in domain])
+
+    if output == 'list':
+        return result
+    if output == 'array':
+        return array('i', result)
+    if output == 'numpy':
+        if np is None:
+            raise ImportError("numpy가 설치되어 있지 않습니다 (output='numpy')")
+        return np.asarray(result, dtype=np.int32)
+    raise ValueError(f"지원하지 않는 output 형식: {output}")
+
+
+# 언어 식별용 테이블 (순서는 동률일 때의 우선순위와 같다)
+_LANGUAGE_NAMES = (
+    'Japanese', 'Korean', 'English', 'Russian', 'Chinese',
+    'Hebrew', 'Vietnamese', 'Thai', 'Portuguese', 'Others',
+)
+_JAPANESE, _KOREAN, _ENGLISH, _RUSSIAN, _CHINESE, _HEBREW, _VIETNAMESE, _THAI, _PORTUGUESE, _OTHERS = range(10)
+
+# 문자가 나올 때마다 (개수 + 1) * 배율로 누적
+_LANGUAGE_MULTIPLIERS = (10, 100, 1, 10, 1, 10, 10, 10, 10, 1)
+
+_PORTUGUESE_CHARS = (
+    0x00C0, 0x00C1, 0x00C2, 0x00C3, 0x00C7, 0x00C8, 0x00C9, 0x00CA, 0x00CB, 0x00CC, 0x00CD, 0x00CE,
+    0x00CF, 0x00D2, 0x00D3, 0x00D4, 0x00D5, 0x00D9, 0x00DA, 0x00DB, 0x00DC, 0x00DD, 0x00E0, 0x00E1,
+    0x00E2, 0x00E3, 0x00E7, 0x00E8, 0x00E9, 0x00EA, 0x00EB, 0x00EC, 0x00ED, 0x00EE, 0x00EF, 0x00F2,
+    0x00F3, 0x00F4, 0x00F5, 0x00F9, 0x00FA, 0x00FB, 0x00FC, 0x00FD,
+)
+
+
+def _build_language_table() -> bytearray:
+    """BMP 코드포인트(64K)별 언어 번호 테이블 생성"""
+    table = bytearray([_OTHERS]) * 0x10000
+
+    # 우선순위가 낮은 범위부터 채우고, 높은 범위가 덮어쓴다
+    ranges = [
+        (0x0E00, 0x0E7F, _THAI),
+        (0x0590, 0x05FF, _HEBREW),
+        (0x0410, 0x044F, _RUSSIAN),
+        (0x00C0, 0x00FF, _VIETNAMESE),
+        (0x0102, 0x01B0, _VIETNAMESE),
+        (0x0041, 0x005A, _ENGLISH),
+        (0x0061, 0x007A, _ENGLISH),
+        (0x4E00, 0x9FFF, _CHINESE),
+        (0x3040, 0x309F, _JAPANESE),
+        (0x30A0, 0x30FF, _JAPANESE),
+        (0xAC00, 0xD7AF, _KOREAN),
     ]
+    for low, high, language in ranges:
+        table[low:high + 1] = bytes([language]) * (high - low + 1)
 
-    result = []
-    for char in chars:
-        unicode_value = ord(char)
-        prefix = 0
+    for code in _PORTUGUESE_CHARS:
+        table[code] = _PORTUGUESE
 
-        for lang in lang_ranges:
-            if lang['range'][0] <= unicode_value <= lang['range'][1]:
-                prefix = lang['prefix']
-                break
+    return table
 
-        result.append(prefix + unicode_value)
 
-    return result
+_LANGUAGE_TABLE = _build_language_table()
 
 
 def identify_language(text: str) -> str:
     """텍스트의 언어 식별"""
     if not text:
         return 'None'
+    if isinstance(text, str):
+        return _identify_language_cached(text)
+    return _identify_language(text)
 
-    language_counts = {
-        'Japanese': 0,
-        'Korean': 0,
-        'English': 0,
-        'Russian': 0,
-        'Chinese': 0,
-        'Hebrew': 0,
-        'Vietnamese': 0,
-        'Thai': 0,
-        'Portuguese': 0,
-        'Others': 0,
-    }
 
-    portuguese_chars = {
-        0x00C0, 0x00C1, 0x00C2, 0x00C3, 0x00C7, 0x00C8, 0x00C9, 0x00CA, 0x00CB, 0x00CC, 0x00CD, 0x00CE,
-        0x00CF, 0x00D2, 0x00D3, 0x00D4, 0x00D5, 0x00D9, 0x00DA, 0x00DB, 0x00DC, 0x00DD, 0x00E0, 0x00E1,
-        0x00E2, 0x00E3, 0x00E7, 0x00E8, 0x00E9, 0x00EA, 0x00EB, 0x00EC, 0x00ED, 0x00EE, 0x00EF, 0x00F2,
-        0x00F3, 0x00F4, 0x00F5, 0x00F9, 0x00FA, 0x00FB, 0x00FC, 0x00FD,
-    }
+@lru_cache(maxsize=65536)
+def _identify_language_cached(text: str) -> str:
+    """단어별 언어 식별 결과 캐시"""
+    return _identify_language(text)
+
+
+def _identify_language(text) -> str:
+    """코드포인트 테이블을 한 번 훑어 언어 식별"""
+    table = _LANGUAGE_TABLE
+    multipliers = _LANGUAGE_MULTIPLIERS
+    counts = [0] * len(_LANGUAGE_NAMES)
 
     for char in text:
         unicode_value = ord(char)
+        language = table[unicode_value] if unicode_value < 0x10000 else _OTHERS
+        counts[language] = (counts[language] + 1) * multipliers[language]
 
-        if unicode_value in portuguese_chars:
-            language_counts['Portuguese'] += 1
-            language_counts['Portuguese'] *= 10
-        elif 0xAC00 <= unicode_value <= 0xD7AF:
-            language_counts['Korean'] += 1
-            language_counts['Korean'] *= 100
-        elif (0x3040 <= unicode_value <= 0x309F) or (0x30A0 <= unicode_value <= 0x30FF):
-            language_counts['Japanese'] += 1
-            language_counts['Japanese'] *= 10
-        elif 0x4E00 <= unicode_value <= 0x9FFF:
-            language_counts['Chinese'] += 1
-        elif (0x0041 <= unicode_value <= 0x005A) or (0x0061 <= unicode_value <= 0x007A):
-            language_counts['English'] += 1
-        elif (0x00C0 <= unicode_value <= 0x00FF) or (0x0102 <= unicode_value <= 0x01B0):
-            language_counts['Vietnamese'] += 1
-            language_counts['Vietnamese'] *= 10
-        elif 0x0410 <= unicode_value <= 0x044F:
-            language_counts['Russian'] += 1
-            language_counts['Russian'] *= 10
-        elif 0x0590 <= unicode_value <= 0x05FF:
-            language_counts['Hebrew'] += 1
-            language_counts['Hebrew'] *= 10
-        elif 0x0E00 <= unicode_value <= 0x0E7F:
-            language_counts['Thai'] += 1
-            language_counts['Thai'] *= 10
-        else:
-            language_counts['Others'] += 1
-
-    total_characters = sum(language_counts.values())
+    total_characters = sum(counts)
     if total_characters == 0:
         return 'None'
 
-    language_ratios = {k: v / total_characters for k, v in language_counts.items()}
-    sorted_languages = sorted(language_ratios.items(), key=lambda x: x[1], reverse=True)
+    language_ratios = [(name, count / total_characters) for name, count in zip(_LANGUAGE_NAMES, counts)]
+    sorted_languages = sorted(language_ratios, key=lambda x: x[1], reverse=True)
 
     identified_language = sorted_languages[0][0]
     max_ratio = sorted_languages[0][1]
@@ -510,17 +987,23 @@ def calculate_similarity(word1: str, word2: str) -> float:
         return min(similarity1, similarity2) / stage_level
 
 
-def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-    """코사인 유사도 계산"""
+def cosine_similarity(vec1: List[float], vec2: List[float],
+                      norm1: Optional[float] = None, norm2: Optional[float] = None) -> float:
+    """코사인 유사도 계산
+
+    norm1/norm2: 미리 계산한 벡터 크기 (잘리지 않은 벡터에만 사용)
+    """
     if len(vec1) != len(vec2):
         # 길이가 다르면 짧은 쪽에 맞춰서 계산
         min_len = min(len(vec1), len(vec2))
-        vec1 = vec1[:min_len]
-        vec2 = vec2[:min_len]
+        if len(vec1) > min_len:
+            vec1, norm1 = vec1[:min_len], None
+        if len(vec2) > min_len:
+            vec2, norm2 = vec2[:min_len], None
 
     dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
+    magnitude1 = math.sqrt(sum(a * a for a in vec1)) if norm1 is None else norm1
+    magnitude2 = math.sqrt(sum(b * b for b in vec2)) if norm2 is None else norm2
 
     if magnitude1 == 0 or magnitude2 == 0:
         return 0.0
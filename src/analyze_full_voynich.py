@@ -4,9 +4,21 @@
 voynich.nowhitespace.txt 파일을 읽어서 전체 텍스트를 분석합니다
 """
 
+import argparse
+import multiprocessing
+import os
 import re
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # numpy는 선택 사항
+    np = None
+
+from advanced_nb_calculator import engine_names, get_engine, set_engine
+from dictionary_features import DictionaryFeatures
+from instrumentation import RunReport
+from voynich_corpus import ANALYZER_TOKEN_PATTERN, VoynichCorpus
 from voynich_analyzer import LanguageMatcher, VoynichAnalyzer
 from language_database import get_total_word_count, get_language_count, LANGUAGE_DATABASE
 
@@ -27,7 +39,115 @@ def split_voynich_text(text):
     
     return words
 
-def analyze_voynich_file(filepath, output_file=None, max_words=None):
+PUNCTUATION = (',', '.', '!', '?', ';', ':')
+
+# 작업 프로세스의 매칭기와 공유 메모리 블록 (블록은 매칭기가 쓰는 동안 열려 있어야 함)
+_WORKER_MATCHER = None
+_WORKER_BLOCK = None
+
+
+def build_matcher():
+    """보이니치 분석기와 전체 언어 데이터베이스를 적재한 매칭기 생성"""
+    analyzer = VoynichAnalyzer()
+    matcher = LanguageMatcher(analyzer)
+    print("데이터베이스 로드 중...")
+    for language, language_words in LANGUAGE_DATABASE.items():
+        matcher.add_language_words(language, language_words)
+    return matcher
+
+
+def translate_word(matcher, idx, voynich_word):
+    """단어 하나의 번역 결과 (idx는 1부터 시작하는 전체 순번)"""
+    # 구두점은 그대로 유지
+    if voynich_word in PUNCTUATION:
+        return {'line': f"{idx}. {voynich_word} -> {voynich_word}", 'word': voynich_word,
+                'language': None, 'similarity': None, 'kind': 'punctuation'}
+
+    # 단어 매칭 (유사도 내림차순으로 정렬되어 있으므로 첫 번째가 최선)
+    matches = matcher.find_matches(voynich_word)
+    if matches:
+        best_match = matches[0]
+        lang = best_match['language']
+        word = best_match['word']
+        similarity = best_match['similarity']
+        return {'line': f"{idx}. {voynich_word} -> {word} ({lang}, {similarity:.1f}%)", 'word': word,
+                'language': lang, 'similarity': similarity, 'kind': 'matched'}
+
+    return {'line': f"{idx}. {voynich_word} -> [매칭 실패]", 'word': f"[{voynich_word}]",
+            'language': None, 'similarity': None, 'kind': 'unmatched'}
+
+
+def translate_shard(shard):
+    """연속된 토큰 구간 (시작 순번, 단어 목록)을 번역 (작업 프로세스에서 실행)"""
+    start, shard_words = shard
+    return [translate_word(_WORKER_MATCHER, start + offset, word) for offset, word in enumerate(shard_words, 1)]
+
+
+def _init_worker(engine_name, descriptor):
+    """작업 프로세스 초기화: 공유 메모리의 사전 특징 배열을 복사 없이 붙여 매칭기 생성
+
+    사전 단어의 n/b 값은 다시 계산하지 않는다. 엔진은 보이니치 단어 계산에만 쓰인다.
+    """
+    global _WORKER_MATCHER, _WORKER_BLOCK
+    set_engine(engine_name)
+    features, _WORKER_BLOCK = DictionaryFeatures.attach(descriptor)
+    _WORKER_MATCHER = LanguageMatcher.from_features(VoynichAnalyzer(), features)
+
+
+def make_shards(words, count):
+    """단어 목록을 순서를 유지하는 연속 구간 count개로 나눔"""
+    count = max(1, min(count, len(words)))
+    size, extra = divmod(len(words), count)
+    shards = []
+    start = 0
+    for index in range(count):
+        stop = start + size + (1 if index < extra else 0)
+        shards.append((start, words[start:stop]))
+        start = stop
+    return shards
+
+
+def translate_words(matcher, words, workers=1):
+    """전체 단어를 번역하고 결과를 원래 순서대로 반환
+
+    workers > 1이면 작업 프로세스들이 연속 구간을 나눠 처리한다. 사전 특징 배열은
+    공유 메모리에 한 번 게시하고 작업 프로세스가 복사 없이 붙이므로, 작업 프로세스를
+    늘려도 시작 시간과 메모리가 거의 늘지 않는다.
+    """
+    total = len(words)
+    results = []
+    step = max(1, total // 20)  # 5%씩 진행률 표시
+
+    def collect(shard_results):
+        before = len(results)
+        results.extend(shard_results)
+        done = len(results)
+        if done // step > before // step or done == total:
+            print(f"진행률: {done}/{total} ({done / total * 100:.1f}%)")
+
+    if workers > 1 and np is None:
+        print("경고: numpy가 없어 사전을 공유 메모리에 게시할 수 없으므로 순차 처리합니다")
+        workers = 1
+
+    if workers <= 1 or total == 0:
+        for idx, voynich_word in enumerate(words, 1):
+            collect([translate_word(matcher, idx, voynich_word)])
+        return results
+
+    # 작업 프로세스당 4개 구간: 긴 단어가 몰린 구간이 있어도 부하가 고르게 나뉜다
+    shards = make_shards(words, workers * 4)
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with matcher.feature_store().publish() as shared:
+        pool = multiprocessing.get_context(method).Pool(
+            workers, initializer=_init_worker, initargs=(get_engine().name, shared.descriptor)
+        )
+        with pool:
+            for shard_results in pool.imap(translate_shard, shards):
+                collect(shard_results)
+    return results
+
+
+def analyze_voynich_file(filepath, output_file=None, max_words=None, workers=1):
     """
     보이니치 파일을 읽어서 전체 분석
     
@@ -35,83 +155,50 @@ def analyze_voynich_file(filepath, output_file=None, max_words=None):
         filepath: 보이니치 텍스트 파일 경로
         output_file: 결과 저장 파일 경로
         max_words: 최대 분석 단어 수 (None이면 전체)
+        workers: 매칭 작업 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
     """
     print("=" * 80)
     print("보이니치 문서 전체 분석 시작")
     print("=" * 80)
     print(f"데이터베이스: {get_language_count()}개 언어, {get_total_word_count()}개 단어")
     print()
+    report = RunReport("analyze_full_voynich")
+    report.metric("nb_engine", get_engine().name)
+    report.metric("workers", workers)
     
-    # 파일 읽기
-    filepath = Path(filepath)
+    # 파일 읽기 및 단어 분리 (색인을 이용해 필요한 구간만 읽음)
+    # 상대 경로는 현재 작업 디렉터리 기준 (VoynichCorpus는 상대 경로를 저장소 루트 기준으로 해석)
+    filepath = Path(filepath).resolve()
     print(f"파일 읽는 중: {filepath}")
-    with filepath.open('r', encoding='utf-8') as f:
-        full_text = f.read()
+    with report.stage("tokenize") as stage:
+        with VoynichCorpus(filepath, ANALYZER_TOKEN_PATTERN) as corpus:
+            total_words = corpus.token_count
+            words = corpus.tokens(0, max_words)
+        stage.add(len(words))
     
-    # 단어로 분리
-    print("텍스트 분리 중...")
-    words = split_voynich_text(full_text)
-    
-    total_words = len(words)
     if max_words:
-        words = words[:max_words]
-        print(f"총 {total_words}개 단어 중 {max_words}개 분석")
+        print(f"총 {total_words}개 단어 중 {len(words)}개 분석")
     else:
         print(f"총 {total_words}개 단어 분석")
     
     print()
     
-    # 보이니치 분석기 초기화
+    # 보이니치 분석기 및 언어 매칭 시스템 초기화
     print("분석 시스템 초기화 중...")
-    analyzer = VoynichAnalyzer()
-    
-    # 언어 매칭 시스템 초기화
-    matcher = LanguageMatcher(analyzer)
-    
-    # 데이터베이스 로드
-    print("데이터베이스 로드 중...")
-    for language, words in LANGUAGE_DATABASE.items():
-        matcher.add_language_words(language, words)
-    
-    # 결과 저장
-    results = []
-    translated_words = []
-    
-    # 진행률 표시를 위한 변수
-    total = len(words)
-    progress_step = max(1, total // 20)  # 5%씩 진행률 표시
+    with report.stage("init", items=get_total_word_count()):
+        matcher = build_matcher()
     
     print("번역 시작...")
+    if workers > 1:
+        print(f"작업 프로세스: {workers}개")
     print("-" * 80)
     
-    for idx, voynich_word in enumerate(words, 1):
-        # 진행률 표시
-        if idx % progress_step == 0 or idx == total:
-            percentage = (idx / total) * 100
-            print(f"진행률: {idx}/{total} ({percentage:.1f}%)")
-        
-        # 구두점은 그대로 유지
-        if voynich_word in [',', '.', '!', '?', ';', ':']:
-            results.append(f"{idx}. {voynich_word} -> {voynich_word}")
-            translated_words.append(voynich_word)
-            continue
-        
-        # 단어 매칭
-        matches = matcher.find_matches(voynich_word, top_n=1)
-        
-        if matches:
-            best_match = matches[0]
-            lang = best_match['language']
-            word = best_match['word']
-            similarity = best_match['similarity']
-            
-            result_line = f"{idx}. {voynich_word} -> {word} ({lang}, {similarity:.1f}%)"
-            results.append(result_line)
-            translated_words.append(word)
-        else:
-            result_line = f"{idx}. {voynich_word} -> [매칭 실패]"
-            results.append(result_line)
-            translated_words.append(f"[{voynich_word}]")
+    with report.stage("match", items=len(words)):
+        translated = translate_words(matcher, words, workers)
+    results = [item['line'] for item in translated]
+    translated_words = [item['word'] for item in translated]
+    for item in translated:
+        report.count(item['kind'])
     
     print("-" * 80)
     print("번역 완료!")
@@ -124,28 +211,29 @@ def analyze_voynich_file(filepath, output_file=None, max_words=None):
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     print(f"결과 저장 중: {output_file}")
-    with output_file.open('w', encoding='utf-8') as f:
-        # 헤더
-        f.write("=" * 80 + "\n")
-        f.write("보이니치 문서 번역 결과\n")
-        f.write("=" * 80 + "\n")
-        f.write(f"총 단어 수: {len(words)}\n")
-        f.write(f"데이터베이스: {get_language_count()}개 언어, {get_total_word_count()}개 단어\n")
-        f.write("\n")
+    with report.stage("write", items=len(results)):
+        with output_file.open('w', encoding='utf-8') as f:
+            # 헤더
+            f.write("=" * 80 + "\n")
+            f.write("보이니치 문서 번역 결과\n")
+            f.write("=" * 80 + "\n")
+            f.write(f"총 단어 수: {len(words)}\n")
+            f.write(f"데이터베이스: {get_language_count()}개 언어, {get_total_word_count()}개 단어\n")
+            f.write("\n")
         
-        # 번역된 텍스트 (한 줄로)
-        f.write("=" * 80 + "\n")
-        f.write("번역된 텍스트:\n")
-        f.write("=" * 80 + "\n")
-        f.write(" ".join(translated_words) + "\n")
-        f.write("\n")
+            # 번역된 텍스트 (한 줄로)
+            f.write("=" * 80 + "\n")
+            f.write("번역된 텍스트:\n")
+            f.write("=" * 80 + "\n")
+            f.write(" ".join(translated_words) + "\n")
+            f.write("\n")
         
-        # 상세 매칭 결과
-        f.write("=" * 80 + "\n")
-        f.write("상세 매칭 결과:\n")
-        f.write("=" * 80 + "\n")
-        for result in results:
-            f.write(result + "\n")
+            # 상세 매칭 결과
+            f.write("=" * 80 + "\n")
+            f.write("상세 매칭 결과:\n")
+            f.write("=" * 80 + "\n")
+            for result in results:
+                f.write(result + "\n")
     
     print(f"✓ 결과가 '{output_file}'에 저장되었습니다")
     print()
@@ -155,16 +243,13 @@ def analyze_voynich_file(filepath, output_file=None, max_words=None):
     print("분석 통계")
     print("=" * 80)
     
-    # 언어별 통계
+    # 언어별 통계 (작업 프로세스 결과를 합친 뒤 계산)
     lang_counts = {}
-    for result in results:
-        if '(' in result and ')' in result:
-            # 언어 정보 추출
-            try:
-                lang_part = result.split('(')[1].split(',')[0]
-                lang_counts[lang_part] = lang_counts.get(lang_part, 0) + 1
-            except:
-                pass
+    similarities = []
+    for item in translated:
+        if item['kind'] == 'matched':
+            lang_counts[item['language']] = lang_counts.get(item['language'], 0) + 1
+            similarities.append(item['similarity'])
     
     if lang_counts:
         print("\n언어별 매칭:")
@@ -172,51 +257,63 @@ def analyze_voynich_file(filepath, output_file=None, max_words=None):
             percentage = (count / len(words)) * 100
             print(f"  {lang}: {count}개 ({percentage:.1f}%)")
     
-    # 평均 유사도 계산
-    similarities = []
-    for result in results:
-        if '%' in result:
-            try:
-                sim_str = result.split('(')[-1].split('%')[0].split(',')[-1].strip()
-                similarities.append(float(sim_str))
-            except:
-                pass
-    
+    # 평균 유사도 계산
     if similarities:
         avg_sim = sum(similarities) / len(similarities)
         print(f"\n평균 유사도: {avg_sim:.1f}%")
+        report.metric("average_similarity", round(avg_sim, 3))
+    report.metric("language_counts", lang_counts)
+    report.write()
     
     print()
     print("분석 완료!")
     print("=" * 80)
 
+MODES = {
+    'test': ('voynich_translation_test.txt', 500),
+    'medium': ('voynich_translation_2000.txt', 2000),
+    'full': ('voynich_translation_full.txt', None),
+}
+
+
 if __name__ == "__main__":
-    # voynich.nowhitespace.txt 파일 분석
-    # 먼저 처음 500단어만 테스트
-    print("보이니치 문서 분석기")
-    print()
-    print("옵션을 선택하세요:")
-    print("1. 테스트 (처음 500단어)")
-    print("2. 중간 분석 (처음 2000단어)")
-    print("3. 전체 분석 (모든 단어)")
-    print()
-    
-    choice = input("선택 (1-3): ").strip()
-    
-    if choice == '1':
-        analyze_voynich_file(DATA_DIR / 'voynich.nowhitespace.txt',
-                           output_file=OUTPUTS_DIR / 'voynich_translation_test.txt',
-                           max_words=500)
-    elif choice == '2':
-        analyze_voynich_file(DATA_DIR / 'voynich.nowhitespace.txt',
-                           output_file=OUTPUTS_DIR / 'voynich_translation_2000.txt',
-                           max_words=2000)
-    elif choice == '3':
-        analyze_voynich_file(DATA_DIR / 'voynich.nowhitespace.txt',
-                           output_file=OUTPUTS_DIR / 'voynich_translation_full.txt',
-                           max_words=None)
-    else:
-        print("잘못된 선택입니다. 기본값(테스트 500단어)으로 실행합니다.")
-        analyze_voynich_file(DATA_DIR / 'voynich.nowhitespace.txt',
-                           output_file=OUTPUTS_DIR / 'voynich_translation_test.txt',
-                           max_words=500)
+    parser = argparse.ArgumentParser(description="보이니치 문서 전체 분석기")
+    parser.add_argument(
+        "--nb-engine",
+        choices=engine_names(),
+        default=None,
+        help="n/b 엔진 (기본값: 환경 변수 NB_ENGINE 또는 reference)",
+    )
+    parser.add_argument("--mode", choices=list(MODES), default=None, help="분석 범위 (생략하면 메뉴에서 선택)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"매칭 작업 프로세스 수 (이 컴퓨터의 CPU: {os.cpu_count()}개)",
+    )
+    args = parser.parse_args()
+    set_engine(args.nb_engine)
+
+    mode = args.mode
+    if mode is None:
+        # voynich.nowhitespace.txt 파일 분석
+        # 먼저 처음 500단어만 테스트
+        print("보이니치 문서 분석기")
+        print()
+        print("옵션을 선택하세요:")
+        print("1. 테스트 (처음 500단어)")
+        print("2. 중간 분석 (처음 2000단어)")
+        print("3. 전체 분석 (모든 단어)")
+        print()
+
+        choice = input("선택 (1-3): ").strip()
+        mode = {'1': 'test', '2': 'medium', '3': 'full'}.get(choice)
+        if mode is None:
+            print("잘못된 선택입니다. 기본값(테스트 500단어)으로 실행합니다.")
+            mode = 'test'
+
+    output_name, max_words = MODES[mode]
+    analyze_voynich_file(DATA_DIR / 'voynich.nowhitespace.txt',
+                         output_file=OUTPUTS_DIR / output_name,
+                         max_words=max_words,
+                         workers=args.workers)
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""\
+Benchmark suite for the n/b engine and the word matchers.
+
+Every benchmark runs a fixed, seeded workload built from
+data/voynich.nowhitespace.txt and the English word database, repeats it and
+reports the best and median time and items/sec. Results are compared with a
+saved baseline (benchmarks/baseline.json) on the best time, which is the
+least noisy; a benchmark slower than the baseline by more than --threshold is
+reported as a regression and the runner exits with status 1.
+
+The n/b engine is pinned with --nb-engine (default: NB_ENGINE or reference)
+and recorded in the results; a baseline recorded with another engine is not
+compared against.
+
+Example:
+    python src/benchmark_nb.py                      # run and compare with the baseline
+    python src/benchmark_nb.py --filter bit_max     # run a subset
+    python src/benchmark_nb.py --save-baseline      # record a new baseline
+    python src/benchmark_nb.py --nb-engine numpy    # benchmark another engine
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+from advanced_nb_calculator import (
+    BIT_MAX_NB,
+    BIT_MIN_NB,
+    bit_max_min_vectors,
+    calculate_bit,
+    engine_names,
+    levenshtein,
+    set_engine,
+    word_nb_unicode_format,
+)
+from english_sentence_from_nb_json import match_words
+from language_database import LANGUAGE_DATABASE
+from voynich_analyzer import LanguageMatcher, VoynichAnalyzer
+from voynich_nb_words_to_json import calculate_nb, load_text, split_words
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BASELINE_PATH = ROOT_DIR / "benchmarks" / "baseline.json"
+CORPUS_PATH = "data/voynich.nowhitespace.txt"
+SEED = 1234
+DEFAULT_SIZES = [25, 100, 400]
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    """A named workload; setup() builds inputs and returns the function to time."""
+
+    name: str
+    items: int
+    setup: Callable[[], Callable[[], object]]
+
+
+def build_benchmarks(sizes: List[int]) -> List[Benchmark]:
+    rng = random.Random(SEED)
+    voynich_words = split_words(load_text(CORPUS_PATH))
+    english_words = LANGUAGE_DATABASE["영어"]
+    # Uniform random samples of corpus tokens and dictionary words
+    voynich_sample = rng.sample(voynich_words, 10)
+    english_sample = rng.sample(english_words, 100)
+    # Corpus sizes are nested prefixes of one random sample, so the time per
+    # word is comparable across sizes and the totals show how the work scales
+    corpus_sample = random.Random(SEED).sample(voynich_words, min(max(sizes, default=0), len(voynich_words)))
+
+    def calculate_bit_setup() -> Callable[[], object]:
+        arrays = [word_nb_unicode_format(word) for word in voynich_sample]
+        return lambda: [calculate_bit(codes) for codes in arrays]
+
+    def bit_max_min_setup(words: List[str]) -> Callable[[], Callable[[], object]]:
+        def setup() -> Callable[[], object]:
+            arrays = [word_nb_unicode_format(word) for word in words]
+            return lambda: [(BIT_MAX_NB(codes), BIT_MIN_NB(codes)) for codes in arrays]
+        return setup
+
+    def unicode_format_setup() -> Callable[[], object]:
+        words = voynich_words + english_words
+
+        def run() -> object:
+            for _ in range(5):
+                results = [word_nb_unicode_format(word) for word in words]
+            return results
+        return run
+
+    def batch_kernel_setup() -> Callable[[], object]:
+        arrays = [word_nb_unicode_format(word) for word in voynich_words + english_words]
+        return lambda: bit_max_min_vectors(arrays)
+
+    def levenshtein_setup() -> Callable[[], object]:
+        pairs = [(rng.choice(voynich_words), rng.choice(voynich_words)) for _ in range(500)]
+        return lambda: [levenshtein(a, b) for a, b in pairs]
+
+    def find_matches_setup() -> Callable[[], object]:
+        matcher = LanguageMatcher(VoynichAnalyzer())
+        matcher.add_language_words("영어", english_words[:200])
+        queries = [word for word in voynich_words if len(word) <= 12][:10]
+
+        def run() -> object:
+            matcher.word_cache.clear()
+            return [matcher.find_matches(word) for word in queries]
+        return run
+
+    def match_words_setup() -> Callable[[], object]:
+        local = random.Random(SEED)
+        e_words = [
+            {"word": word, "nb_max": local.uniform(0, 100), "nb_min": local.uniform(0, 100)}
+            for word in english_words
+        ]
+        v_words = [
+            {"word": f"v{i}", "nb_max": local.uniform(0, 100), "nb_min": local.uniform(0, 100)}
+            for i in range(200)
+        ]
+        return lambda: match_words(v_words, e_words, len(v_words))
+
+    def corpus_setup(size: int) -> Callable[[], Callable[[], object]]:
+        def setup() -> Callable[[], object]:
+            text = " ".join(corpus_sample[:size])
+
+            def run() -> object:
+                return [calculate_nb(word) for word in split_words(text)]
+            return run
+        return setup
+
+    benchmarks = [
+        Benchmark("calculate_bit", len(voynich_sample), calculate_bit_setup),
+        Benchmark("bit_max_min_voynich", len(voynich_sample), bit_max_min_setup(voynich_sample)),
+        Benchmark("bit_max_min_english", len(english_sample), bit_max_min_setup(english_sample)),
+        Benchmark("word_nb_unicode_format", 5 * (len(voynich_words) + len(english_words)), unicode_format_setup),
+        Benchmark("levenshtein", 500, levenshtein_setup),
+        Benchmark("find_matches", 10, find_matches_setup),
+        Benchmark("match_words", 200, match_words_setup),
+    ]
+    if np is not None:
+        benchmarks.append(Benchmark("bit_max_min_batch_kernel", len(voynich_words) + len(english_words), batch_kernel_setup))
+    benchmarks += [Benchmark(f"corpus_{size}", size, corpus_setup(size)) for size in sizes]
+    return benchmarks
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int) -> Dict[str, float]:
+    func = benchmark.setup()
+    timings = []
+    for _ in range(repeat):
+        # Like timeit: collect first, then keep the collector out of the timed region
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    best = min(timings)
+    return {
+        "items": benchmark.items,
+        "repeat": repeat,
+        "min_s": round(best, 6),
+        "median_s": round(statistics.median(timings), 6),
+        "items_per_s": round(benchmark.items / best, 2) if best else None,
+    }
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path: Path) -> Dict | None:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Print the comparison table and return the names of regressed benchmarks"""
+    regressions = []
+    reference = baseline.get("results", {})
+    print(f"\n{'benchmark':<24}{'best':>12}{'baseline':>12}{'ratio':>9}")
+    for name, result in results.items():
+        base = reference.get(name)
+        if base is None:
+            print(f"{name:<24}{result['min_s']:>11.4f}s{'-':>12}{'-':>9}")
+            continue
+        ratio = result["min_s"] / base["min_s"] if base["min_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<24}{result['min_s']:>11.4f}s{base['min_s']:>11.4f}s{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the n/b engine and matchers")
+    parser.add_argument(
+        "--nb-engine",
+        choices=engine_names(),
+        default=None,
+        help="n/b engine to benchmark (default: NB_ENGINE environment variable or reference)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--filter", default=None, help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (words)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown of the best time over the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument("--json", default=None, help="Also write results to this JSON path")
+    args = parser.parse_args()
+    engine = set_engine(args.nb_engine).name
+    print(f"n/b engine: {engine}")
+
+    benchmarks = build_benchmarks(args.sizes)
+    if args.filter:
+        benchmarks = [bench for bench in benchmarks if args.filter in bench.name]
+    if not benchmarks:
+        print("No benchmarks selected")
+        return 1
+
+    results: Dict[str, Dict] = {}
+    for bench in benchmarks:
+        print(f"{bench.name} ...", end=" ", flush=True)
+        results[bench.name] = run_benchmark(bench, args.repeat)
+        result = results[bench.name]
+        print(f"{result['min_s']:.4f}s best, {result['median_s']:.4f}s median, {result['items_per_s']} items/s")
+
+    payload = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "nb_engine": engine,
+        "seed": SEED,
+        "results": results,
+    }
+    baseline_path = Path(args.baseline)
+    if not baseline_path.is_absolute():
+        baseline_path = ROOT_DIR / baseline_path
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        baseline = load_baseline(baseline_path) or {}
+        if baseline.get("nb_engine") != engine:
+            baseline = {}  # never mix timings of different engines in one baseline
+        # Keep entries for benchmarks that were filtered out of this run
+        merged = dict(baseline.get("results", {}), **results)
+        payload["results"] = merged
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved: {baseline_path}")
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+    if baseline.get("nb_engine") != engine:
+        print(
+            f"\nBaseline was recorded with the {baseline.get('nb_engine', 'unknown')!r} n/b engine, "
+            f"not {engine!r}; not comparing (rerun with --nb-engine or --save-baseline)"
+        )
+        return 1
+    if baseline.get("machine") != machine_info():
+        print("\nNOTE: baseline was recorded on a different machine; ratios are indicative only")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
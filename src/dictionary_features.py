@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""\
+Dictionary feature store for LanguageMatcher, shareable between processes.
+
+LanguageMatcher.add_language_words keeps one dict per dictionary word (word,
+unicode, max, min). DictionaryFeatures holds the same data as numpy columns:
+
+    codes     int32 matrix, one row per word, zero-padded to the longest word
+    lengths   int32 number of codes per row
+    nb_max    float64 BIT_MAX_NB of the codes
+    nb_min    float64 BIT_MIN_NB of the codes
+    norms     float64 Euclidean norm of each row (summed in code order, so it
+              equals the magnitude cosine_similarity computes)
+    language  int16 index into ``languages``
+
+publish() copies the columns and the UTF-8 word list into one
+multiprocessing.shared_memory block and returns a SharedFeatures handle whose
+``descriptor`` is a small picklable dict. A worker process calls
+DictionaryFeatures.attach(descriptor) and gets numpy views on that block: no
+n/b recomputation and no per-worker copy of the codes. The publishing process
+owns the block and must close() the handle (or use it as a context manager)
+once the workers are done.
+
+Example:
+    with matcher.feature_store().publish() as shared:
+        pool = Pool(workers, initializer=init, initargs=(shared.descriptor,))
+        ...
+    # in the worker
+    features, block = DictionaryFeatures.attach(descriptor)
+    matcher = LanguageMatcher.from_features(VoynichAnalyzer(), features)
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+# Column name -> dtype, in block order
+COLUMNS = (
+    ("codes", "int32"),
+    ("lengths", "int32"),
+    ("nb_max", "float64"),
+    ("nb_min", "float64"),
+    ("norms", "float64"),
+    ("language", "int16"),
+    ("word_offsets", "int64"),
+    ("word_bytes", "uint8"),
+)
+_ALIGN = 64
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for DictionaryFeatures")
+
+
+def row_norm(codes: Sequence[float]) -> float:
+    """Norm of one code row, summed left to right like cosine_similarity"""
+    return math.sqrt(sum(float(code) * float(code) for code in codes))
+
+
+@dataclass
+class DictionaryFeatures:
+    """Dictionary words and their matching features as numpy columns."""
+
+    languages: List[str]
+    words: List[str]
+    codes: "np.ndarray"
+    lengths: "np.ndarray"
+    nb_max: "np.ndarray"
+    nb_min: "np.ndarray"
+    norms: "np.ndarray"
+    language: "np.ndarray"
+
+    @classmethod
+    def from_database(cls, language_database: Dict[str, List[Dict[str, object]]]) -> "DictionaryFeatures":
+        """Build from LanguageMatcher.language_database (language -> word dicts)"""
+        _require_numpy()
+        languages = list(language_database)
+        entries = [(index, entry) for index, name in enumerate(languages) for entry in language_database[name]]
+        count = len(entries)
+        lengths = np.fromiter((len(entry["unicode"]) for _, entry in entries), dtype=np.int32, count=count)
+        codes = np.zeros((count, int(lengths.max()) if count else 0), dtype=np.int32)
+        for row, (_, entry) in enumerate(entries):
+            codes[row, :lengths[row]] = entry["unicode"]
+        return cls(
+            languages=languages,
+            words=[str(entry["word"]) for _, entry in entries],
+            codes=codes,
+            lengths=lengths,
+            nb_max=np.fromiter((entry["max"] for _, entry in entries), dtype=np.float64, count=count),
+            nb_min=np.fromiter((entry["min"] for _, entry in entries), dtype=np.float64, count=count),
+            norms=np.fromiter((row_norm(entry["unicode"]) for _, entry in entries), dtype=np.float64, count=count),
+            language=np.fromiter((index for index, _ in entries), dtype=np.int16, count=count),
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def codes_of(self, index: int) -> "np.ndarray":
+        return self.codes[index, :self.lengths[index]]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numeric columns"""
+        return sum(getattr(self, name).nbytes for name, _ in COLUMNS[:6])
+
+    def _block_columns(self) -> Dict[str, "np.ndarray"]:
+        encoded = [word.encode("utf-8") for word in self.words]
+        word_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=word_offsets[1:])
+        columns = {name: getattr(self, name) for name, _ in COLUMNS[:6]}
+        columns["word_offsets"] = word_offsets
+        columns["word_bytes"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return columns
+
+    def publish(self) -> "SharedFeatures":
+        """Copy the store into a new shared memory block"""
+        columns = self._block_columns()
+        layout = {}
+        size = 0
+        for name, dtype in COLUMNS:
+            column = np.ascontiguousarray(columns[name], dtype=dtype)
+            layout[name] = (size, dtype, list(column.shape))
+            size += -(-column.nbytes // _ALIGN) * _ALIGN
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            for name, dtype in COLUMNS:
+                offset, _, shape = layout[name]
+                view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+                view[...] = columns[name]
+                del view  # a live view keeps block.buf exported and close() would fail
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+        descriptor = {"name": block.name, "languages": list(self.languages), "layout": layout}
+        return SharedFeatures(block, descriptor)
+
+    @classmethod
+    def attach(cls, descriptor: Dict[str, object]) -> Tuple["DictionaryFeatures", shared_memory.SharedMemory]:
+        """Map a published store; the numeric columns are views on the block
+
+        Keep the returned block referenced for as long as the features are used.
+        """
+        _require_numpy()
+        block = _open_block(descriptor["name"])
+        views = {
+            name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+            for name, (offset, dtype, shape) in descriptor["layout"].items()
+        }
+        offsets = views.pop("word_offsets").tolist()
+        data = views.pop("word_bytes").tobytes()
+        words = [data[start:stop].decode("utf-8") for start, stop in zip(offsets, offsets[1:])]
+        for view in views.values():
+            view.flags.writeable = False
+        return cls(languages=list(descriptor["languages"]), words=words, **views), block
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching also registers the block with the resource tracker.
+    # Pool workers share the publisher's tracker, where the name is already
+    # registered, so this is a no-op and only the publisher's unlink() removes it
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFeatures:
+    """Owner handle of a published feature store."""
+
+    def __init__(self, block: shared_memory.SharedMemory, descriptor: Dict[str, object]) -> None:
+        self.block = block
+        self.descriptor = descriptor
+
+    @property
+    def size(self) -> int:
+        return self.block.size
+
+    def close(self) -> None:
+        """Release and remove the block; attached workers must be finished"""
+        if self.block is None:
+            return
+        self.block.close()
+        self.block.unlink()
+        self.block = None
+
+    def __enter__(self) -> "SharedFeatures":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
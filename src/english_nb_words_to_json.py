@@ -4,6 +4,7 @@ Generate n/b metrics for English words and save to JSON.
 
 Example:
     python src/english_nb_words_to_json.py
+    NB_ENGINE=numpy python src/english_nb_words_to_json.py
 """
 
 from __future__ import annotations
@@ -13,7 +14,15 @@ import json
 from pathlib import Path
 from typing import Dict, List
 
-from advanced_nb_calculator import BIT_MAX_NB, BIT_MIN_NB, word_nb_unicode_format
+from advanced_nb_calculator import (
+    BIT_MAX_NB,
+    BIT_MIN_NB,
+    bit_max_min_batch,
+    engine_names,
+    set_engine,
+    word_nb_unicode_format,
+)
+from instrumentation import RunReport
 from language_database import LANGUAGE_DATABASE
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -31,6 +40,16 @@ def calculate_nb(word: str) -> Dict[str, object]:
     }
 
 
+def calculate_nb_batch(words: List[str]) -> List[Dict[str, object]]:
+    """calculate_nb for many words through the engine's batch entry point"""
+    codes = [word_nb_unicode_format(word) for word in words]
+    metrics = bit_max_min_batch(codes)
+    return [
+        {"word": word, "length": len(word), "nb_max": nb_max, "nb_min": nb_min, "nb_codes": nb_codes}
+        for word, nb_codes, (nb_max, nb_min) in zip(words, codes, metrics)
+    ]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="English n/b JSON generator")
     parser.add_argument(
@@ -40,18 +59,25 @@ def main() -> int:
     )
     parser.add_argument("--limit", type=int, default=None, help="Limit number of words")
     parser.add_argument("--no-codes", action="store_true", help="Omit nb_codes from output")
+    parser.add_argument(
+        "--nb-engine",
+        choices=engine_names(),
+        default=None,
+        help="n/b engine (default: $NB_ENGINE or reference)",
+    )
     args = parser.parse_args()
+    report = RunReport("english_nb_words")
+    report.metric("nb_engine", set_engine(args.nb_engine).name)
 
     words: List[str] = LANGUAGE_DATABASE.get("영어", [])
     if args.limit is not None:
         words = words[: args.limit]
 
-    results = []
-    for word in words:
-        item = calculate_nb(word)
-        if args.no_codes:
+    with report.stage("nb", items=len(words)):
+        results = calculate_nb_batch(words)
+    if args.no_codes:
+        for item in results:
             item.pop("nb_codes", None)
-        results.append(item)
 
     payload = {
         "language": "영어",
@@ -64,9 +90,11 @@ def main() -> int:
         output_path = ROOT_DIR / output_path
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with output_path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=2)
+    with report.stage("write", items=len(results)):
+        with output_path.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
 
+    report.write()
     return 0
 
 
@@ -7,20 +7,36 @@ Example:
         --voynich outputs/voynich_nb_words.json \
         --english outputs/english_nb_words.json \
         --output outputs/voynich_to_english_sentence.txt \
+        --artifact outputs/voynich_to_english_matches.bin \
         --limit 50
+
+    # float32 n/b columns, checking top-1 agreement with float64
+    python src/english_sentence_from_nb_json.py --precision float32 --check-precision
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-import os
-import urllib.request
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+from instrumentation import RunReport
+from llm_client import LLMClient, LLMError, get_default_client
+from match_artifact import write_match_artifact
+from nb_table import FLOAT32_SCORE_TOLERANCE, PRECISIONS, NBTable
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
+SKIP_WORD = "nightingale"
+REPEAT_PENALTY = 0.5
+RECENT_WORDS = 5
 
 
 def load_json(path: str) -> Dict:
@@ -38,7 +54,7 @@ def score_pair(v_item: Dict[str, object], e_item: Dict[str, object]) -> float:
 
 def match_words(v_words: List[Dict[str, object]], e_words: List[Dict[str, object]], limit: int) -> List[Tuple[str, str, float]]:
     results: List[Tuple[str, str, float]] = []
-    used_words = deque(maxlen=5)  # Track last 5 used words to avoid repetition
+    used_words = deque(maxlen=RECENT_WORDS)  # Track last 5 used words to avoid repetition
 
     for v_item in v_words[:limit]:
         best_score = None
@@ -47,14 +63,14 @@ def match_words(v_words: List[Dict[str, object]], e_words: List[Dict[str, object
         
         for idx, e_item in enumerate(e_words):
             # Skip nightingale
-            if e_item["word"].lower() == "nightingale":
+            if e_item["word"].lower() == SKIP_WORD:
                 continue
                 
             score = score_pair(v_item, e_item)
             
             # Penalize recently used words (within last 5 matches)
             if e_item["word"] in used_words:
-                score += 0.5  # Add penalty to encourage diversity
+                score += REPEAT_PENALTY  # Add penalty to encourage diversity
             
             if best_score is None or score < best_score:
                 best_score = score
@@ -69,53 +85,214 @@ def match_words(v_words: List[Dict[str, object]], e_words: List[Dict[str, object
     return results
 
 
-def translate_word_gpt(word: str, model: str, api_key: str) -> str:
+class ArrayMatcher:
+    """match_words scoring over NBTable columns: one vectorized pass per Voynich word."""
+
+    def __init__(self, e_words: List[Dict[str, object]], precision: str = "float64") -> None:
+        self.e_words = e_words
+        self.table = NBTable.from_items(e_words, precision)
+        self.skip = np.array([word.lower() == SKIP_WORD for word in self.table.words], dtype=bool)
+        positions: Dict[str, List[int]] = {}
+        for index, word in enumerate(self.table.words):
+            positions.setdefault(word, []).append(index)
+        self.positions = {word: np.array(indexes) for word, indexes in positions.items()}
+
+    def scores(self, nb_max: float, nb_min: float, used_words: deque) -> "np.ndarray":
+        dtype = self.table.nb_max.dtype.type
+        scores = np.abs(self.table.nb_max - dtype(nb_max)) + np.abs(self.table.nb_min - dtype(nb_min))
+        for word in set(used_words):
+            scores[self.positions.get(word, [])] += REPEAT_PENALTY
+        scores[self.skip] = np.inf
+        return scores
+
+    def best(self, v_item: Dict[str, object], used_words: deque) -> int:
+        # argmin returns the first minimum, like the strict < scan in match_words
+        return int(np.argmin(self.scores(v_item["nb_max"], v_item["nb_min"], used_words)))
+
+    def exact_score(self, v_item: Dict[str, object], index: int, used_words: deque) -> float:
+        """float64 score of a pick, as match_words reports it"""
+        e_item = self.e_words[index]
+        score = score_pair(v_item, e_item)
+        if e_item["word"] in used_words:
+            score += REPEAT_PENALTY
+        return float(score)
+
+
+def match_words_array(
+    v_words: List[Dict[str, object]],
+    e_words: List[Dict[str, object]],
+    limit: int,
+    precision: str = "float64",
+) -> List[Tuple[str, str, float]]:
+    """match_words on numpy columns; float64 gives identical results, float32 may differ only on near ties"""
+    matcher = ArrayMatcher(e_words, precision)
+    results: List[Tuple[str, str, float]] = []
+    used_words = deque(maxlen=RECENT_WORDS)
+    for v_item in v_words[:limit]:
+        best = matcher.best(v_item, used_words)
+        best_word = matcher.table.words[best]
+        results.append((v_item["word"], best_word, matcher.exact_score(v_item, best, used_words)))
+        used_words.append(best_word)
+    return results
+
+
+def check_top1_agreement(
+    v_words: List[Dict[str, object]],
+    e_words: List[Dict[str, object]],
+    limit: int,
+    precision: str = "float32",
+    tolerance: float = FLOAT32_SCORE_TOLERANCE,
+) -> Dict[str, object]:
+    """Compare reduced-precision picks with float64 picks row by row under the float64 history
+
+    A disagreement is a near tie when the float64 scores of both picks are within
+    2 * tolerance; anything else is a violation of the documented tolerance.
+    """
+    exact = ArrayMatcher(e_words, "float64")
+    reduced = ArrayMatcher(e_words, precision)
+    used_words = deque(maxlen=RECENT_WORDS)
+    rows = agree = near_ties = 0
+    violations: List[Dict[str, object]] = []
+    for v_item in v_words[:limit]:
+        rows += 1
+        best = exact.best(v_item, used_words)
+        candidate = reduced.best(v_item, used_words)
+        if candidate == best:
+            agree += 1
+        else:
+            gap = exact.exact_score(v_item, candidate, used_words) - exact.exact_score(v_item, best, used_words)
+            if gap <= 2 * tolerance:
+                near_ties += 1
+            else:
+                violations.append(
+                    {"word": v_item["word"], "float64": exact.table.words[best], precision: exact.table.words[candidate], "gap": gap}
+                )
+        used_words.append(exact.table.words[best])
+    return {"rows": rows, "agree": agree, "near_ties": near_ties, "violations": violations, "tolerance": tolerance}
+
+
+WORD_SYSTEM_PROMPT = "Translate this English word to Korean. Reply with only the Korean word."
+BATCH_SYSTEM_PROMPT = (
+    "Translate each English word in the JSON array to Korean. "
+    "Reply with only a JSON object mapping every input word to its Korean word."
+)
+
+
+def translate_word_gpt(word: str, model: str, client: LLMClient | None = None) -> str:
     """Translate a single word to Korean"""
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": "Translate this English word to Korean. Reply with only the Korean word."},
-            {"role": "user", "content": word},
-        ],
-        "temperature": 0.2,
+    if client is None:
+        client = get_default_client()
+
+    messages = [
+        {"role": "system", "content": WORD_SYSTEM_PROMPT},
+        {"role": "user", "content": word},
+    ]
+    try:
+        return client.chat(messages, model=model, temperature=0.2)
+    except LLMError:
+        return word
+
+
+def parse_batch_reply(content: str, words: List[str]) -> Dict[str, str]:
+    """Parse a JSON object reply into a mapping, keeping only the requested words"""
+    text = content.strip()
+    # Models sometimes wrap JSON in a markdown code block
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    requested = set(words)
+    return {
+        word: korean.strip()
+        for word, korean in parsed.items()
+        if word in requested and isinstance(korean, str) and korean.strip()
     }
 
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
 
+def translate_batch_gpt(words: List[str], model: str, client: LLMClient | None = None) -> Dict[str, str]:
+    """Translate several words in one request; words missing from the reply are left out"""
+    if client is None:
+        client = get_default_client()
+
+    messages = [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(words, ensure_ascii=False)},
+    ]
     try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            body = response.read().decode("utf-8")
-            parsed = json.loads(body)
-            if "choices" in parsed and parsed["choices"]:
-                return parsed["choices"][0]["message"]["content"].strip()
-            return word
-    except Exception:
-        return word
+        # Only replies that parse are cached; a malformed reply falls back to single-word requests
+        content = client.chat(
+            messages,
+            model=model,
+            temperature=0.2,
+            cache_if=lambda reply: bool(parse_batch_reply(reply, words)),
+        )
+    except LLMError:
+        return {}
+    return parse_batch_reply(content, words)
+
+
+def translate_words_gpt(
+    words: List[str],
+    model: str,
+    client: LLMClient | None = None,
+    concurrency: int = 8,
+    batch_size: int = 1,
+) -> Dict[str, str]:
+    """Translate unique words concurrently over the client's keep-alive connections.
+
+    With batch_size > 1, words are sent batch_size per request and any word
+    the reply omits is retried with a single-word request.
+    """
+    if client is None:
+        client = get_default_client()
+
+    unique_words = list(dict.fromkeys(words))
+    word_translations: Dict[str, str] = {}
 
+    def translate(word: str) -> str:
+        return translate_word_gpt(word, model, client)
 
-def translate_sentence_gpt(sentence: str, model: str) -> str:
+    def translate_batch(batch: List[str]) -> Dict[str, str]:
+        return translate_batch_gpt(batch, model, client)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        if batch_size > 1:
+            batches = [
+                unique_words[i:i + batch_size]
+                for i in range(0, len(unique_words), batch_size)
+            ]
+            for batch_translations in pool.map(translate_batch, batches):
+                word_translations.update(batch_translations)
+
+        missing = [word for word in unique_words if word not in word_translations]
+        word_translations.update(zip(missing, pool.map(translate, missing)))
+
+    return {word: word_translations[word] for word in unique_words}
+
+
+def translate_sentence_gpt(
+    sentence: str,
+    model: str,
+    concurrency: int = 8,
+    batch_size: int = 1,
+    client: LLMClient | None = None,
+) -> str:
     """Translate a sentence by translating individual words and combining them"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if client is None:
+        client = get_default_client()
+    if not client.available:
         return "[skipped: missing OPENAI_API_KEY]"
 
     words = sentence.split()
     # Translate only unique words to save API calls
-    unique_words = list(dict.fromkeys(words))
-    
-    word_translations = {}
-    for word in unique_words:
-        korean = translate_word_gpt(word, model, api_key)
-        word_translations[word] = korean
+    word_translations = translate_words_gpt(words, model, client, concurrency, batch_size)
 
     # Build final translation using the translated words
     translated_words = [word_translations.get(w, w) for w in words]
@@ -127,12 +304,32 @@ def main() -> int:
     parser.add_argument("--voynich", default="outputs/voynich_nb_words.json", help="Voynich n/b JSON path")
     parser.add_argument("--english", default="outputs/english_nb_words.json", help="English n/b JSON path")
     parser.add_argument("--output", default="outputs/voynich_to_english_sentence.txt", help="Output text path")
+    parser.add_argument("--artifact", default="outputs/voynich_to_english_matches.bin", help="Structured match artifact path")
     parser.add_argument("--limit", type=int, default=1000, help="Number of Voynich words to map")
     parser.add_argument("--model", default="gpt-4o-mini", help="OpenAI model for translation")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent translation requests")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per request on 429/5xx/network errors")
+    parser.add_argument("--batch-size", type=int, default=50, help="Words per translation request (1 = one word per request)")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: $OPENAI_BASE_URL or OpenAI)")
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default="float64",
+        help="Precision of the n/b columns used for matching (float32 may change picks only on near ties)",
+    )
+    parser.add_argument(
+        "--check-precision",
+        action="store_true",
+        help="With --precision float32, verify top-1 agreement with float64 and fail on violations",
+    )
     args = parser.parse_args()
+    if args.check_precision and args.precision == "float64":
+        parser.error("--check-precision compares a reduced precision with float64; use it with --precision float32")
+    report = RunReport("english_sentence_from_nb_json")
 
-    v_data = load_json(args.voynich)
-    e_data = load_json(args.english)
+    with report.stage("load"):
+        v_data = load_json(args.voynich)
+        e_data = load_json(args.english)
 
     v_words = v_data.get("words", [])
     e_words = e_data.get("words", [])
@@ -140,27 +337,76 @@ def main() -> int:
     if not v_words or not e_words:
         raise SystemExit("No words found in one or both JSON files.")
 
-    matches = match_words(v_words, e_words, args.limit)
+    precision = args.precision
+    if np is None and precision != "float64":
+        print(f"WARNING: numpy is not installed; matching in float64 instead of {precision}")
+        if args.check_precision:
+            print("WARNING: --check-precision skipped; matching runs in float64")
+        precision = "float64"
+    if precision != "float64" and args.check_precision:
+        with report.stage("precision_check"):
+            agreement = check_top1_agreement(v_words, e_words, args.limit, precision)
+        report.metric("top1_agreement", {key: value for key, value in agreement.items() if key != "violations"})
+        print(
+            f"Top-1 agreement {precision} vs float64: {agreement['agree']}/{agreement['rows']} "
+            f"({agreement['near_ties']} near ties within {2 * agreement['tolerance']:g})"
+        )
+        for violation in agreement["violations"]:
+            print(f"  VIOLATION: {violation}")
+        if agreement["violations"]:
+            return 1
+
+    with report.stage("match") as stage:
+        if np is None:
+            matches = match_words(v_words, e_words, args.limit)
+        else:
+            matches = match_words_array(v_words, e_words, args.limit, precision)
+        stage.add(len(matches))
+    report.metric("english_candidates", len(e_words))
+    report.metric("match_precision", precision)
     sentence = " ".join(match[1] for match in matches)
-    translation = translate_sentence_gpt(sentence, args.model)
+    client = LLMClient(base_url=args.base_url, retries=args.retries)
+    try:
+        with report.stage("translate", items=len(matches)):
+            translation = translate_sentence_gpt(
+                sentence,
+                args.model,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+                client=client,
+            )
+        report.llm(client)
+    finally:
+        client.close()
 
     output_path = Path(args.output)
     if not output_path.is_absolute():
         output_path = ROOT_DIR / output_path
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with output_path.open("w", encoding="utf-8") as handle:
-        handle.write("# Voynich to English (n/b match)\n")
-        handle.write(f"Count: {len(matches)}\n")
-        handle.write("\n")
-        handle.write("Sentence:\n")
-        handle.write(sentence + "\n\n")
-        handle.write("GPT Translation (Korean):\n")
-        handle.write(translation + "\n\n")
-        handle.write("Details:\n")
-        for v_word, e_word, score in matches:
-            handle.write(f"{v_word}\t{e_word}\t{score:.6f}\n")
+    with report.stage("write", items=len(matches)):
+        with output_path.open("w", encoding="utf-8") as handle:
+            handle.write("# Voynich to English (n/b match)\n")
+            handle.write(f"Count: {len(matches)}\n")
+            handle.write("\n")
+            handle.write("Sentence:\n")
+            handle.write(sentence + "\n\n")
+            handle.write("GPT Translation (Korean):\n")
+            handle.write(translation + "\n\n")
+            handle.write("Details:\n")
+            for v_word, e_word, score in matches:
+                handle.write(f"{v_word}\t{e_word}\t{score:.6f}\n")
+
+        # Columnar copy of the same results for the page generators
+        write_match_artifact(
+            args.artifact,
+            matches,
+            sentence,
+            translation,
+            meta={"model": args.model, "voynich": args.voynich, "english": args.english, "limit": args.limit},
+        )
 
+    report.write()
     return 0
 
 
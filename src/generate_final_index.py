@@ -3,19 +3,19 @@
 Generate final index.html using GPT AI based on voynich_interpretation.html content.
 
 This script:
-1. Reads voynich_interpretation.html and voynich_to_english_sentence.txt
+1. Reads voynich_interpretation.html and the Voynich match artifact
 2. Uses GPT to generate a complete, beautiful HTML page with full narrative
 3. Outputs complete index.html
 """
 
 from __future__ import annotations
 
-import json
-import os
-import urllib.request
 from pathlib import Path
 from typing import Dict
 
+from llm_client import LLMClient, LLMError, get_default_client
+from match_artifact import load_match_artifact
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 
 
@@ -27,38 +27,27 @@ def load_files() -> Dict[str, str]:
         "sentence_story": "",  # Full English sentence story
     }
     
-    # Load content from voynich_to_english_sentence.txt
-    sent_file = ROOT_DIR / "outputs" / "voynich_to_english_sentence.txt"
-    if sent_file.exists():
-        with sent_file.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-            in_sentence = False
-            in_translation = False
-            for i, line in enumerate(lines):
-                if line.startswith("Sentence:"):
-                    in_sentence = True
-                    in_translation = False
-                elif line.startswith("GPT Translation"):
-                    in_sentence = False
-                    in_translation = True
-                elif line.startswith("Details:"):
-                    break
-                elif in_sentence and line.strip():
-                    result["sentence_story"] = line.strip()  # Full story from file
-                    result["english_sentence"] += line.strip() + " "
-                elif in_translation and line.strip():
-                    result["korean_translation"] += line.strip() + " "
-    
-    result["korean_translation"] = result["korean_translation"].strip()
-    result["english_sentence"] = result["english_sentence"].strip()
+    # Load sentence and translation from the match artifact
+    artifact = load_match_artifact()
+    if artifact is not None:
+        with artifact:
+            result["korean_translation"] = artifact.translation.strip()
+            result["english_sentence"] = artifact.sentence.strip()
+            result["sentence_story"] = result["english_sentence"]  # Full story from file
     
     return result
 
 
-def generate_html_with_gpt(korean_translation: str, english_sentence: str, sentence_story: str = "") -> str:
+def generate_html_with_gpt(
+    korean_translation: str,
+    english_sentence: str,
+    sentence_story: str = "",
+    client: LLMClient | None = None,
+) -> str:
     """Generate complete HTML using GPT AI"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if client is None:
+        client = get_default_client()
+    if not client.available:
         return generate_fallback_html(korean_translation, english_sentence, sentence_story)
     
     korean_preview = korean_translation[:100]
@@ -90,51 +79,30 @@ def generate_html_with_gpt(korean_translation: str, english_sentence: str, sente
 
 HTML 코드만 출력하세요. 설명이나 다른 텍스트는 제외."""
 
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are an expert HTML5 developer creating beautiful, semantic web pages. Generate complete, valid HTML5 code with proper structure, styling, and content."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "temperature": 0.7,
-        "max_tokens": 4000,
-    }
+    messages = [
+        {
+            "role": "system",
+            "content": "You are an expert HTML5 developer creating beautiful, semantic web pages. Generate complete, valid HTML5 code with proper structure, styling, and content."
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
     
     try:
         print("Calling GPT to generate final HTML...", end=" ", flush=True)
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            "https://api.openai.com/v1/chat/completions",
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        
-        with urllib.request.urlopen(request, timeout=60) as response:
-            body = response.read().decode("utf-8")
-            parsed = json.loads(body)
-            if "choices" in parsed and parsed["choices"]:
-                html_content = parsed["choices"][0]["message"]["content"].strip()
-                # Remove markdown code block markers if present
-                if html_content.startswith("```html"):
-                    html_content = html_content[7:]
-                if html_content.endswith("```"):
-                    html_content = html_content[:-3]
-                html_content = html_content.strip()
-                print("✓")
-                return html_content
-        print("(failed)")
-    except Exception as e:
-        print(f"(Error: {type(e).__name__})")
+        html_content = client.chat(messages, temperature=0.7, max_tokens=4000, timeout=60)
+        # Remove markdown code block markers if present
+        if html_content.startswith("```html"):
+            html_content = html_content[7:]
+        if html_content.endswith("```"):
+            html_content = html_content[:-3]
+        html_content = html_content.strip()
+        print("✓")
+        return html_content
+    except LLMError as e:
+        print(f"(Error: {e})")
     
     return generate_fallback_html(korean_translation, english_sentence, sentence_story)
 
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""\
+Streaming HTML output for the generated pages.
+
+Large link sections (one <a> per Voynich token or word) are written straight
+to the output stream through a small buffer instead of being collected in
+lists and joined into one big string, so memory use stays flat no matter how
+many links a section holds. All user text goes through escape_html.
+
+Page templates (templates/index.html) mark generated regions with named
+slots, ``<!--@slot:name-->``; write_template streams the literal text and
+calls one writer per slot, so a page is never assembled as one string.
+
+Example:
+    with index_path.open("w", encoding="utf-8") as f, HTMLStreamWriter(f) as out:
+        out.write_links(iter_word_links(words))
+"""
+
+from __future__ import annotations
+
+import html
+import io
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Mapping, TextIO, Tuple
+
+SEARCH_URL = "https://search.naver.com/search.naver?query=보이니치+해석+"
+LINK_INDENT = " " * 16
+DEFAULT_BUFFER_SIZE = 64 * 1024
+SLOT_PATTERN = re.compile(r"<!--@slot:(\w+)-->")
+
+
+def escape_html(text: str, quote: bool = True) -> str:
+    """Escape &, <, > (and quotes when quote=True) for HTML text and attributes"""
+    return html.escape(text, quote)
+
+
+class HTMLStreamWriter:
+    """Buffered writer that forwards HTML text to a file-like object."""
+
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.chars_written = 0
+        self._parts: list[str] = []
+        self._pending = 0
+
+    def write(self, text: str) -> None:
+        """Write markup as-is"""
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def text(self, value: str) -> None:
+        """Write escaped text content"""
+        self.write(escape_html(value, quote=False))
+
+    def write_links(
+        self,
+        links: Iterable[str],
+        separator: str = ",\n",
+        terminator: str = ".\n",
+        prefix: str = LINK_INDENT,
+    ) -> int:
+        """Write links one by one, separated by commas and closed with a period.
+
+        Returns the number of links written.
+        """
+        count = 0
+        for link in links:
+            if count:
+                self.write(separator)
+            self.write(prefix)
+            self.write(link)
+            count += 1
+        if count:
+            self.write(terminator)
+        return count
+
+    def flush(self) -> None:
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self.chars_written += self._pending
+            self._parts.clear()
+            self._pending = 0
+
+    def __enter__(self) -> "HTMLStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+
+def word_link(word: str) -> str:
+    """Search link for a single word"""
+    escaped = escape_html(word)
+    return f'<a href="{SEARCH_URL}{escaped}">{escaped}</a>'
+
+
+def voynich_link(voynich_word: str, english_word: str) -> str:
+    """Search link for a Voynich token, titled with its English match"""
+    escaped_voynich = escape_html(voynich_word)
+    escaped_english = escape_html(english_word)
+    return (
+        f'<a href="{SEARCH_URL}{escaped_english}" title="{escaped_voynich} → {escaped_english}">'
+        f"{escaped_voynich}</a>"
+    )
+
+
+def iter_word_links(words: Iterable[str]) -> Iterator[str]:
+    """Links for non-empty words"""
+    for word in words:
+        clean = word.strip()
+        if clean:
+            yield word_link(clean)
+
+
+def iter_voynich_links(pairs: Iterable[Tuple[str, str]], limit: int | None = None) -> Iterator[str]:
+    """Links for (voynich, english) pairs; limit=None links every pair"""
+    if limit is not None:
+        pairs = islice(pairs, limit)
+    for voynich_word, english_word in pairs:
+        yield voynich_link(voynich_word, english_word)
+
+
+def load_template(path: Path) -> List[str]:
+    """Split a template into alternating literal text and slot names"""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        return SLOT_PATTERN.split(handle.read())
+
+
+def write_template(
+    out: HTMLStreamWriter,
+    parts: List[str],
+    slots: Mapping[str, Callable[[HTMLStreamWriter], object]],
+) -> None:
+    """Stream a split template, calling slots[name](out) for every slot"""
+    for name in parts[1::2]:
+        if name not in slots:
+            raise KeyError(f"Unknown template slot: {name}")
+    for index, part in enumerate(parts):
+        if index % 2:
+            slots[part](out)
+        else:
+            out.write(part)
+
+
+def render_to_string(write: Callable[..., object], *args: object, **kwargs: object) -> str:
+    """Run a streaming writer function against an in-memory buffer"""
+    buffer = io.StringIO()
+    with HTMLStreamWriter(buffer) as out:
+        write(out, *args, **kwargs)
+    return buffer.getvalue()
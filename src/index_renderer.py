@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""\
+Incremental index.html renderer.
+
+The page is defined by templates/index.html, which marks every generated
+region with a named slot (<!--@slot:name-->). Each slot is rendered from its
+own inputs; rendered fragments are cached on disk together with a hash of
+those inputs, so only sections whose data changed are rebuilt. The Voynich
+link section is streamed link by link into its fragment file and from there
+into the page, so memory does not grow with the number of links. The page is
+streamed to a temporary file and replaces index.html atomically, and only
+when its content changed.
+
+Example:
+    python src/index_renderer.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List, TextIO, Tuple
+
+from generate_index_html import (
+    TEMPLATE_PATH,
+    VOYNICH_LINK_LIMIT,
+    build_word_links,
+    load_voynich_data,
+    write_voynich_links,
+)
+from html_stream import DEFAULT_BUFFER_SIZE, HTMLStreamWriter, escape_html, load_template, write_template
+from instrumentation import RunReport
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+INDEX_PATH = ROOT_DIR / "index.html"
+FRAGMENT_DIR = ROOT_DIR / ".cache" / "index_fragments"
+GPT_STORY_PATH = ROOT_DIR / "outputs" / "voynich_gpt_story.txt"
+
+STORY_PLACEHOLDER = "GPT 해석이 준비 중입니다..."
+# Part of every section's input hash; bump it when a renderer's output changes
+# so fragments cached by the old renderer are rebuilt
+RENDER_VERSION = 2
+
+
+def _english_words(data: Dict) -> List[str]:
+    return data["english_sentence"].split()
+
+
+def _korean_words(data: Dict) -> List[str]:
+    return data["korean_translation"].split()
+
+
+def _voynich_links_hash(data: Dict) -> str:
+    """Hash of the linked pairs, computed pair by pair"""
+    digest = hashlib.sha256(json.dumps(VOYNICH_LINK_LIMIT).encode("utf-8"))
+    for pair in islice(data["pairs"], VOYNICH_LINK_LIMIT):
+        digest.update(json.dumps(list(pair), ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# slot name -> (input extractor, renderer)
+SECTIONS: Dict[str, Tuple[Callable[[Dict], object], Callable[[object], str]]] = {
+    "english_links": (_english_words, build_word_links),
+    "english_sentence": (_english_words, lambda words: escape_html(" ".join(words), quote=False)),
+    "english_word_count": (lambda data: len(_english_words(data)), str),
+    "korean_links": (_korean_words, build_word_links),
+    "gpt_story": (
+        lambda data: data.get("gpt_story", ""),
+        lambda story: escape_html(story or STORY_PLACEHOLDER, quote=False),
+    ),
+    "pair_count": (lambda data: len(data["pairs"]), str),
+}
+
+# slot name -> (input hash, streaming writer); these are never held as one string
+STREAMED_SECTIONS: Dict[str, Tuple[Callable[[Dict], str], Callable[[HTMLStreamWriter, Dict], object]]] = {
+    "voynich_links": (_voynich_links_hash, lambda out, data: write_voynich_links(out, data["pairs"])),
+}
+
+
+def content_hash(value: object) -> str:
+    """Stable SHA-256 of a JSON-serializable value"""
+    material = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _HashingStream:
+    """Text stream wrapper that hashes the UTF-8 bytes it forwards."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.digest = hashlib.sha256()
+
+    def write(self, text: str) -> None:
+        self.digest.update(text.encode("utf-8"))
+        self.stream.write(text)
+
+
+def file_hash(path: Path) -> str | None:
+    """SHA-256 of a file's bytes, read in chunks; None if it cannot be read"""
+    digest = hashlib.sha256()
+    try:
+        with Path(path).open("rb") as handle:
+            for chunk in iter(lambda: handle.read(DEFAULT_BUFFER_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def write_streamed(
+    path: Path,
+    write: Callable[[HTMLStreamWriter], object],
+    replace_same: bool = True,
+) -> Tuple[str, int, bool]:
+    """Stream markup into a temporary file next to path, then replace path in one step
+
+    Returns (SHA-256 of the content, characters written, whether path was
+    replaced). With replace_same=False an existing file with the same content
+    is left untouched.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as handle:
+            hashing = _HashingStream(handle)
+            with HTMLStreamWriter(hashing) as out:
+                write(out)
+        content_digest = hashing.digest.hexdigest()
+        if not replace_same and file_hash(path) == content_digest:
+            os.unlink(tmp_name)
+            return content_digest, out.chars_written, False
+        # mkstemp creates 0600 files; keep the existing mode or use the umask default
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return content_digest, out.chars_written, True
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write text to a temporary file next to path, then replace path in one step"""
+    write_streamed(path, lambda out: out.write(text))
+
+
+def copy_file(out: HTMLStreamWriter, path: Path) -> None:
+    """Stream a UTF-8 file into the writer in chunks"""
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        for chunk in iter(lambda: handle.read(DEFAULT_BUFFER_SIZE), ""):
+            out.write(chunk)
+
+
+class FragmentCache:
+    """On-disk cache of rendered section fragments keyed by a hash of their inputs."""
+
+    def __init__(self, directory: Path = FRAGMENT_DIR) -> None:
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        try:
+            with self.manifest_path.open("r", encoding="utf-8") as handle:
+                self.manifest: Dict[str, Dict[str, str]] = json.load(handle)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def _fragment_path(self, name: str) -> Path:
+        return self.directory / f"{name}.html"
+
+    def get(self, name: str, input_hash: str) -> str | None:
+        entry = self.manifest.get(name)
+        if not entry or entry.get("input") != input_hash:
+            return None
+        try:
+            fragment = self._fragment_path(name).read_text(encoding="utf-8")
+        except OSError:
+            return None
+        if hashlib.sha256(fragment.encode("utf-8")).hexdigest() != entry.get("output"):
+            return None
+        return fragment
+
+    def get_path(self, name: str, input_hash: str) -> Path | None:
+        """Path of a valid cached fragment, checked without loading it whole"""
+        entry = self.manifest.get(name)
+        if not entry or entry.get("input") != input_hash:
+            return None
+        path = self._fragment_path(name)
+        return path if file_hash(path) == entry.get("output") else None
+
+    def put_stream(self, name: str, input_hash: str, write: Callable[[HTMLStreamWriter], object]) -> Path:
+        """Stream a fragment straight to its cache file"""
+        path = self._fragment_path(name)
+        output_hash, _, _ = write_streamed(path, write)
+        self.manifest[name] = {"input": input_hash, "output": output_hash}
+        return path
+
+    def put(self, name: str, input_hash: str, fragment: str) -> None:
+        write_atomic(self._fragment_path(name), fragment)
+        self.manifest[name] = {
+            "input": input_hash,
+            "output": hashlib.sha256(fragment.encode("utf-8")).hexdigest(),
+        }
+
+    def save(self) -> None:
+        write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2, sort_keys=True))
+
+
+def load_page_data() -> Dict:
+    """Load every input the page needs (matching results and the GPT story)"""
+    data = load_voynich_data()
+    data["gpt_story"] = ""
+    if GPT_STORY_PATH.exists():
+        data["gpt_story"] = GPT_STORY_PATH.read_text(encoding="utf-8").strip()
+    return data
+
+
+def render_index(
+    data: Dict,
+    output_path: Path = INDEX_PATH,
+    template_path: Path = TEMPLATE_PATH,
+    cache_dir: Path = FRAGMENT_DIR,
+) -> Dict[str, object]:
+    """Render the page, re-rendering only sections whose inputs changed.
+
+    Returns which slots were rendered or served from cache and whether the
+    output file was rewritten.
+    """
+    parts = load_template(template_path)
+    cache = FragmentCache(cache_dir)
+    slots: Dict[str, Callable[[HTMLStreamWriter], object]] = {}
+    rendered: List[str] = []
+    cached: List[str] = []
+
+    for name in parts[1::2]:
+        if name in slots:
+            continue
+        if name in STREAMED_SECTIONS:
+            hash_inputs, write = STREAMED_SECTIONS[name]
+            input_hash = hash_inputs(data)
+            path = cache.get_path(name, input_hash)
+            if path is None:
+                path = cache.put_stream(name, input_hash, lambda out, write=write: write(out, data))
+                rendered.append(name)
+            else:
+                cached.append(name)
+            slots[name] = lambda out, path=path: copy_file(out, path)
+            continue
+        if name not in SECTIONS:
+            raise KeyError(f"Unknown template slot: {name}")
+        extract, render = SECTIONS[name]
+        inputs = extract(data)
+        input_hash = content_hash([RENDER_VERSION, inputs])
+        fragment = cache.get(name, input_hash)
+        if fragment is None:
+            fragment = render(inputs)
+            cache.put(name, input_hash, fragment)
+            rendered.append(name)
+        else:
+            cached.append(name)
+        slots[name] = lambda out, fragment=fragment: out.write(fragment)
+
+    _, size, written = write_streamed(
+        Path(output_path), lambda out: write_template(out, parts, slots), replace_same=False
+    )
+    cache.save()
+
+    return {"rendered": rendered, "cached": cached, "written": written, "size": size}
+
+
+def main() -> int:
+    print("=" * 50)
+    print("index.html 렌더링")
+    print("=" * 50)
+
+    report = RunReport("index_renderer")
+    with report.stage("load"):
+        data = load_page_data()
+    if not data["english_sentence"]:
+        print("ERROR: 영어 문장을 찾을 수 없습니다.")
+        return 1
+
+    with report.stage("render", items=len(data["pairs"])):
+        result = render_index(data)
+    report.cache("index_fragments", len(result["cached"]), len(result["rendered"]))
+    report.metric("written", result["written"])
+    report.metric("page_chars", result["size"])
+    report.write()
+    print(f"✓ 다시 렌더링한 섹션: {', '.join(result['rendered']) or '없음'}")
+    print(f"✓ 캐시 사용 섹션: {', '.join(result['cached']) or '없음'}")
+    if result["written"]:
+        print(f"✓ index.html 업데이트 완료: {INDEX_PATH} ({result['size'] / 1024:.1f} KB)")
+    else:
+        print("✓ 변경 사항 없음 (index.html 그대로 유지)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
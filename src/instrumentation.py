@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""\
+Lightweight run instrumentation: stage timers, counters and a JSON report.
+
+Each pipeline script creates a RunReport, wraps its stages in
+``report.stage(...)`` and calls ``report.write()`` at the end. The report
+records wall and CPU time per stage, items/sec, counters, cache hit rates,
+GPT client metrics and peak RSS, so runs can be compared over time.
+
+Environment variables:
+    PIPELINE_REPORT_DIR      report directory (default: .cache/reports)
+    PIPELINE_REPORT_DISABLE  set to 1 to skip writing reports
+
+Example:
+    report = RunReport("voynich_nb_words")
+    with report.stage("nb", items=len(words)):
+        results = [calculate_nb(word) for word in words]
+    report.write()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_REPORT_DIR = ROOT_DIR / ".cache" / "reports"
+
+
+def peak_rss_mb(children: bool = False) -> float | None:
+    """Peak resident set size of this process (or its largest finished child) in MiB"""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+@dataclass
+class Stage:
+    """Accumulated timings for one named stage."""
+
+    name: str
+    calls: int = 0
+    duration: float = 0.0
+    cpu: float = 0.0
+    items: int = 0
+
+    def add(self, items: int = 1) -> None:
+        """Count processed items while the stage is running"""
+        self.items += items
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "duration_s": round(self.duration, 6),
+            "cpu_s": round(self.cpu, 6),
+            "items": self.items,
+            "items_per_s": round(self.items / self.duration, 2) if self.duration and self.items else None,
+        }
+
+
+class RunReport:
+    """Collects stage timings, counters and metrics for a single run."""
+
+    def __init__(self, run: str) -> None:
+        self.run = run
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self.stages: Dict[str, Stage] = {}
+        self.counters: Dict[str, int] = {}
+        self.metrics: Dict[str, object] = {}
+        self.caches: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[Stage]:
+        """Time a block; repeated stages with the same name accumulate"""
+        with self._lock:
+            stage = self.stages.setdefault(name, Stage(name))
+            stage.calls += 1
+            stage.items += items
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - started
+            cpu = time.process_time() - cpu_started
+            with self._lock:
+                stage.duration += elapsed
+                stage.cpu += cpu
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def metric(self, name: str, value: object) -> None:
+        self.metrics[name] = value
+
+    def cache(self, name: str, hits: int, misses: int) -> None:
+        """Record hit/miss counts for a cache"""
+        lookups = hits + misses
+        self.caches[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+    def lru_cache(self, name: str, func: object) -> None:
+        """Record hit/miss counts of a functools.lru_cache wrapped function"""
+        info = func.cache_info()
+        self.cache(name, info.hits, info.misses)
+
+    def llm(self, client: object) -> None:
+        """Record an LLMClient's request metrics and response cache statistics"""
+        metrics = client.metrics.as_dict()
+        self.metrics["llm"] = metrics
+        self.cache("llm_calls", metrics["cache_hits"], metrics["calls"] - metrics["cache_hits"])
+        response_cache = getattr(client, "cache", None)
+        if response_cache is not None:
+            self.cache("gpt_response_cache", response_cache.hits, response_cache.misses)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "run": self.run,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_s": round(time.perf_counter() - self._started, 6),
+            "cpu_s": round(time.process_time() - self._cpu_started, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": [stage.as_dict() for stage in self.stages.values()],
+            "counters": self.counters,
+            "caches": self.caches,
+            "metrics": self.metrics,
+        }
+
+    def write(self, directory: str | Path | None = None) -> Path | None:
+        """Write <run>-<timestamp>.json and <run>-latest.json; returns the timestamped path"""
+        if os.getenv("PIPELINE_REPORT_DISABLE", "").strip() not in ("", "0"):
+            return None
+        directory = Path(directory or os.getenv("PIPELINE_REPORT_DIR") or DEFAULT_REPORT_DIR)
+        text = json.dumps(self.as_dict(), ensure_ascii=False, indent=2, default=str)
+        stamp = self.started_at.strftime("%Y%m%d-%H%M%S")
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{self.run}-{stamp}.json"
+            path.write_text(text, encoding="utf-8")
+            (directory / f"{self.run}-latest.json").write_text(text, encoding="utf-8")
+        except OSError as exc:
+            # A report is diagnostics only; never fail the run over it
+            print(f"WARNING: run report not written: {exc}")
+            return None
+        return path
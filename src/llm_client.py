@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""\
+Shared client for OpenAI-compatible chat completion APIs.
+
+Every GPT call in the pipeline goes through LLMClient, which provides:
+- keep-alive HTTP(S) connections, one per worker thread
+- per-request timeouts
+- retry with exponential backoff on 429, 5xx and network errors
+- request / latency / token metrics
+- a pluggable base URL (OPENAI_BASE_URL) for local stub servers
+- the persistent response cache from response_cache
+
+Example:
+    client = LLMClient()
+    text = client.chat([{"role": "user", "content": "hello"}], temperature=0.2)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Tuple
+
+from response_cache import ResponseCache, get_response_cache
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Sentinel: use the shared cache from get_response_cache()
+_DEFAULT_CACHE = object()
+
+
+class LLMError(Exception):
+    """A chat completion request failed after all retries."""
+
+    def __init__(self, message: str, status: int | None = None, body: str = "") -> None:
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class KeepAliveConnections:
+    """Per-thread keep-alive HTTP(S) connections, reused across requests."""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = 30) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: List[http.client.HTTPConnection] = []
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.scheme == "https":
+                conn = http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._open.append(conn)
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def post_json(
+        self,
+        endpoint: str,
+        payload: Dict,
+        headers: Dict[str, str],
+        timeout: float | None = None,
+    ) -> Tuple[int, bytes]:
+        """POST a JSON payload on this thread's connection and return (status, body)."""
+        data = json.dumps(payload).encode("utf-8")
+        headers = {**headers, "Content-Type": "application/json"}
+        conn = self._connection()
+        conn.timeout = self.timeout if timeout is None else timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(conn.timeout)
+        try:
+            conn.request("POST", self.path + endpoint, body=data, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            # The server may have dropped the idle connection; reconnect next time.
+            self._reset()
+            raise
+        if response.will_close:
+            self._reset()
+        return response.status, body
+
+    def close(self) -> None:
+        """Close every connection opened by any thread."""
+        with self._lock:
+            for conn in self._open:
+                conn.close()
+            self._open.clear()
+        self._local = threading.local()
+
+
+@dataclass
+class ClientMetrics:
+    """Counters collected by an LLMClient."""
+
+    calls: int = 0
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    cache_hits: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["latency_avg"] = self.latency_total / self.requests if self.requests else 0.0
+        return data
+
+
+class LLMClient:
+    """Chat completion client with pooled connections, retries, metrics and caching."""
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff: float = 1.0,
+        cache: ResponseCache | None | object = _DEFAULT_CACHE,
+    ) -> None:
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = get_response_cache() if cache is _DEFAULT_CACHE else cache
+        self.metrics = ClientMetrics()
+        self.connections = KeepAliveConnections(self.base_url, timeout)
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """True when an API key is configured"""
+        return bool(self.api_key)
+
+    def _record(self, **deltas: float) -> None:
+        with self._metrics_lock:
+            for name, value in deltas.items():
+                setattr(self.metrics, name, getattr(self.metrics, name) + value)
+
+    def complete(self, payload: Dict, timeout: float | None = None) -> Dict:
+        """Send a raw chat completion payload and return the parsed JSON response."""
+        if not self.api_key:
+            raise LLMError("missing OPENAI_API_KEY")
+
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        status, body = None, b""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._record(retries=1)
+            started = time.perf_counter()
+            try:
+                status, body = self.connections.post_json("/chat/completions", payload, headers, timeout)
+            except (OSError, http.client.HTTPException) as exc:
+                status, body = None, str(exc).encode("utf-8")
+            elapsed = time.perf_counter() - started
+            with self._metrics_lock:
+                self.metrics.requests += 1
+                self.metrics.latency_total += elapsed
+                self.metrics.latency_max = max(self.metrics.latency_max, elapsed)
+
+            if status == 200:
+                try:
+                    parsed = json.loads(body.decode("utf-8"))
+                except ValueError as exc:
+                    self._record(failures=1)
+                    raise LLMError("invalid JSON response", status, body.decode("utf-8", "replace")) from exc
+                usage = parsed.get("usage") or {}
+                self._record(
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    total_tokens=usage.get("total_tokens", 0),
+                )
+                return parsed
+            if status is not None and status != 429 and status < 500:
+                break
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+
+        self._record(failures=1)
+        detail = body.decode("utf-8", "replace")
+        if status is None:
+            raise LLMError(f"network error: {detail[:100]}", None, detail)
+        raise LLMError(f"HTTP {status}", status, detail)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        timeout: float | None = None,
+        use_cache: bool = True,
+        cache_if: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Return the stripped content of the first choice for a chat request.
+
+        With cache_if, a reply is cached (and a cached reply reused) only when
+        cache_if(content) is true, so replies the caller cannot use are not replayed.
+        """
+        payload: Dict = {"model": model, "messages": messages}
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+
+        self._record(calls=1)
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(payload)
+            if cached is not None and (cache_if is None or cache_if(cached)):
+                self._record(cache_hits=1)
+                return cached
+
+        parsed = self.complete(payload, timeout)
+        try:
+            content = parsed["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError, AttributeError) as exc:
+            self._record(failures=1)
+            raise LLMError("unexpected response structure", 200, json.dumps(parsed)[:300]) from exc
+
+        if cache is not None and (cache_if is None or cache_if(content)):
+            cache.put(payload, content)
+        return content
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        timeout: float | None = None,
+        use_cache: bool = True,
+        cache_if: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Async version of chat(); runs on a worker thread with its own pooled connection."""
+        return await asyncio.to_thread(
+            self.chat, messages, model, temperature, max_tokens, timeout, use_cache, cache_if
+        )
+
+    def close(self) -> None:
+        self.connections.close()
+
+
+_default_client: LLMClient | None = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> LLMClient:
+    """Shared client configured from the environment"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
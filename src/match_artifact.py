@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""\
+Structured artifact for Voynich -> English match results.
+
+english_sentence_from_nb_json writes the matches next to the readable
+voynich_to_english_sentence.txt as a small columnar binary file. The page
+generators open it directly instead of re-parsing the text report; the pairs
+table is memory-mapped and decoded lazily, so opening the file costs the same
+for ten pairs or the full corpus.
+
+Layout (all offsets relative to the start of the column area):
+    8 bytes   magic b"VNBMATCH"
+    uint32    format version
+    uint32    header length
+    header    UTF-8 JSON: count, sentence, translation, byteorder, meta, columns
+    columns   8-byte aligned: voynich_offsets (uint32, count+1), voynich_text (UTF-8),
+              english_codes (uint32, count), english_offsets (uint32, vocab+1),
+              english_text (UTF-8), scores (float64, count)
+
+Example:
+    python src/match_artifact.py --from-text outputs/voynich_to_english_sentence.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+ARTIFACT_PATH = ROOT_DIR / "outputs" / "voynich_to_english_matches.bin"
+LEGACY_TEXT_PATH = ROOT_DIR / "outputs" / "voynich_to_english_sentence.txt"
+
+MAGIC = b"VNBMATCH"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+def _resolve(path: str | Path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else ROOT_DIR / path
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+def _encode_strings(values: Sequence[str]) -> Tuple[array, bytes]:
+    offsets = array("I", [0])
+    chunks = []
+    total = 0
+    for value in values:
+        encoded = value.encode("utf-8")
+        chunks.append(encoded)
+        total += len(encoded)
+        offsets.append(total)
+    return offsets, b"".join(chunks)
+
+
+def write_match_artifact(
+    path: str | Path,
+    matches: Sequence[Tuple[str, str, float]],
+    sentence: str,
+    translation: str,
+    meta: Dict | None = None,
+) -> Path:
+    """Write (voynich, english, score) matches plus sentence and translation"""
+    vocabulary: Dict[str, int] = {}
+    english_codes = array("I", (vocabulary.setdefault(e_word, len(vocabulary)) for _, e_word, _ in matches))
+    voynich_offsets, voynich_text = _encode_strings([v_word for v_word, _, _ in matches])
+    english_offsets, english_text = _encode_strings(list(vocabulary))
+    scores = array("d", (float(score) for _, _, score in matches))
+
+    blocks: List[Tuple[str, str, bytes]] = [
+        ("voynich_offsets", "I", voynich_offsets.tobytes()),
+        ("voynich_text", "B", voynich_text),
+        ("english_codes", "I", english_codes.tobytes()),
+        ("english_offsets", "I", english_offsets.tobytes()),
+        ("english_text", "B", english_text),
+        ("scores", "d", scores.tobytes()),
+    ]
+    columns: Dict[str, List] = {}
+    position = 0
+    for name, typecode, data in blocks:
+        columns[name] = [position, len(data), typecode]
+        position += len(data) + _pad(len(data))
+
+    header = json.dumps(
+        {
+            "count": len(matches),
+            "vocabulary": len(vocabulary),
+            "sentence": sentence,
+            "translation": translation,
+            "byteorder": sys.byteorder,
+            "meta": meta or {},
+            "columns": columns,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    path = _resolve(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            handle.write(header)
+            handle.write(b"\0" * _pad(_PREAMBLE.size + len(header)))
+            for _, _, data in blocks:
+                handle.write(data)
+                handle.write(b"\0" * _pad(len(data)))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return path
+
+
+class PairTable(Sequence):
+    """Read-only (voynich, english) pairs decoded on access from mapped columns."""
+
+    def __init__(
+        self,
+        voynich_offsets: Sequence[int],
+        voynich_text: memoryview,
+        english_codes: Sequence[int],
+        vocabulary: List[str],
+        scores: Sequence[float],
+    ) -> None:
+        self._voynich_offsets = voynich_offsets
+        self._voynich_text = voynich_text
+        self._english_codes = english_codes
+        self._vocabulary = vocabulary
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return len(self._english_codes)
+
+    def voynich(self, index: int) -> str:
+        start = self._voynich_offsets[index]
+        end = self._voynich_offsets[index + 1]
+        return str(self._voynich_text[start:end], "utf-8")
+
+    def english(self, index: int) -> str:
+        return self._vocabulary[self._english_codes[index]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pair index out of range")
+        return self.voynich(index), self.english(index)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for index in range(len(self)):
+            yield self.voynich(index), self.english(index)
+
+    def matches(self) -> Iterator[Tuple[str, str, float]]:
+        """(voynich, english, score) triples"""
+        for index in range(len(self)):
+            yield self.voynich(index), self.english(index), self.scores[index]
+
+    def release(self) -> None:
+        for view in (self._voynich_offsets, self._voynich_text, self._english_codes, self.scores):
+            if isinstance(view, memoryview):
+                view.release()
+
+
+class MatchArtifact:
+    """Memory-mapped view of a match artifact written by write_match_artifact."""
+
+    def __init__(self, path: str | Path = ARTIFACT_PATH) -> None:
+        self.path = _resolve(path)
+        with self.path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, header_len = _PREAMBLE.unpack_from(self._map, 0)
+        except struct.error as exc:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a match artifact") from exc
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} match artifact")
+
+        header_end = _PREAMBLE.size + header_len
+        header = json.loads(self._map[_PREAMBLE.size:header_end].decode("utf-8"))
+        self.count: int = header["count"]
+        self.sentence: str = header["sentence"]
+        self.translation: str = header["translation"]
+        self.meta: Dict = header.get("meta", {})
+
+        base = header_end + _pad(header_end)
+        view = memoryview(self._map)
+        swap = header["byteorder"] != sys.byteorder
+        columns = {}
+        for name, (offset, length, typecode) in header["columns"].items():
+            raw = view[base + offset:base + offset + length]
+            if typecode == "B":
+                columns[name] = raw
+            elif swap:
+                # Written on a machine with the other byte order: decode eagerly
+                values = array(typecode, raw.tobytes())
+                values.byteswap()
+                raw.release()
+                columns[name] = values
+            else:
+                columns[name] = raw.cast(typecode)
+        view.release()
+
+        english_offsets = columns["english_offsets"]
+        english_text = columns["english_text"]
+        vocabulary = [
+            str(english_text[english_offsets[i]:english_offsets[i + 1]], "utf-8")
+            for i in range(len(english_offsets) - 1)
+        ]
+        for name in ("english_offsets", "english_text"):
+            if isinstance(columns[name], memoryview):
+                columns[name].release()
+
+        self.pairs = PairTable(
+            columns["voynich_offsets"],
+            columns["voynich_text"],
+            columns["english_codes"],
+            vocabulary,
+            columns["scores"],
+        )
+
+    def page_data(self) -> Dict:
+        """Sentence, translation and pairs in the shape the HTML generators use"""
+        return {
+            "english_sentence": self.sentence,
+            "korean_translation": self.translation,
+            "pairs": self.pairs,
+        }
+
+    def close(self) -> None:
+        self.pairs.release()
+        self._map.close()
+
+    def __enter__(self) -> "MatchArtifact":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def read_legacy_text(path: str | Path = LEGACY_TEXT_PATH) -> Tuple[List[Tuple[str, str, float]], str, str]:
+    """Parse a voynich_to_english_sentence.txt report into (matches, sentence, translation)"""
+    sections: Dict[str, List[str]] = {"sentence": [], "translation": []}
+    matches: List[Tuple[str, str, float]] = []
+    section = None
+    with _resolve(path).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("Sentence:"):
+                section = "sentence"
+            elif line.startswith("GPT Translation"):
+                section = "translation"
+            elif line.startswith("Details:"):
+                section = "details"
+            elif not line.strip() or section is None:
+                continue
+            elif section == "details":
+                parts = line.strip().split("\t")
+                if len(parts) >= 2:
+                    score = float(parts[2]) if len(parts) > 2 else 0.0
+                    matches.append((parts[0], parts[1], score))
+            else:
+                sections[section].append(line.strip())
+    return matches, " ".join(sections["sentence"]), " ".join(sections["translation"])
+
+
+def convert_legacy_text(
+    text_path: str | Path = LEGACY_TEXT_PATH,
+    artifact_path: str | Path = ARTIFACT_PATH,
+) -> Path:
+    """Build the artifact from an existing text report"""
+    matches, sentence, translation = read_legacy_text(text_path)
+    return write_match_artifact(
+        artifact_path, matches, sentence, translation, meta={"source": Path(text_path).name}
+    )
+
+
+def load_match_artifact(
+    path: str | Path = ARTIFACT_PATH,
+    legacy_path: str | Path = LEGACY_TEXT_PATH,
+) -> MatchArtifact | None:
+    """Open the artifact, converting the text report if only that exists or it is newer
+
+    A text report edited or regenerated after the artifact was written wins,
+    so it is converted again. Close the returned artifact (or use it as a
+    context manager) before the file is rewritten.
+    """
+    path = _resolve(path)
+    legacy_path = _resolve(legacy_path)
+    try:
+        legacy_mtime = legacy_path.stat().st_mtime_ns
+    except OSError:
+        legacy_mtime = None
+    try:
+        artifact_mtime = path.stat().st_mtime_ns
+    except OSError:
+        artifact_mtime = None
+    if artifact_mtime is None and legacy_mtime is None:
+        return None
+    if legacy_mtime is not None and (artifact_mtime is None or legacy_mtime > artifact_mtime):
+        convert_legacy_text(legacy_path, path)
+    return MatchArtifact(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or inspect the Voynich match artifact")
+    parser.add_argument("--from-text", default=None, help="Convert a voynich_to_english_sentence.txt report")
+    parser.add_argument("--output", default=str(ARTIFACT_PATH), help="Artifact path")
+    args = parser.parse_args()
+
+    if args.from_text:
+        path = convert_legacy_text(args.from_text, args.output)
+        print(f"Wrote: {path}")
+
+    artifact = load_match_artifact(args.output)
+    if artifact is None:
+        print(f"ERROR: {args.output} not found")
+        return 1
+    with artifact:
+        print(f"Pairs: {artifact.count}")
+        print(f"Sentence words: {len(artifact.sentence.split())}")
+        print(f"Translation words: {len(artifact.translation.split())}")
+        for v_word, e_word, score in islice(artifact.pairs.matches(), 5):
+            print(f"  {v_word}\t{e_word}\t{score:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,7 @@ from advanced_nb_calculator import (
     BIT_MAX_NB, BIT_MIN_NB,
     calculate_array_order_and_duplicate
 )
+from nb_code_records import NBCodeSequence
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT_DIR / "data"
@@ -34,19 +35,12 @@ class NBCodeAnalyzer:
         return self.char_to_number[char]
     
     def text_to_nb_codes(self, text):
-        """텍스트를 n/b 코드로 변환"""
-        codes = []
-        for char in text:
-            if char.strip():
-                number = self.assign_number(char)
-                binary = format(number, '08b')
-                codes.append({
-                    'char': char,
-                    'number': number,
-                    'binary': binary,
-                    'bit_count': bin(number).count('1')
-                })
-        return codes
+        """텍스트를 n/b 코드로 변환
+
+        NBCodeSequence (문자 번호 array 열)를 반환한다. 항목의 binary와
+        bit_count는 접근할 때 계산한다.
+        """
+        return NBCodeSequence.from_text(text, self.assign_number, self.number_to_char)
     
     def word_to_nb(self, word):
         """단어를 n/b 코드로 변환"""
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""\
+Compact per-character n/b code records.
+
+NBCodeConverter.text_to_nb_codes and NBCodeAnalyzer.text_to_nb_codes used to
+return one dict per character with eagerly formatted strings. NBCodeSequence
+keeps only the character numbers in an ``array('I')`` (4 bytes per character)
+plus a reference to the converter's number -> character table; characters map
+one-to-one to numbers, so no character column is needed.
+
+Indexing a sequence yields an NBCodeRecord, a ``__slots__`` record whose
+``binary``, ``nb_code`` and ``bit_count`` are computed on access. Records also
+answer ``record['char']`` style lookups, so code written against the old dicts
+keeps working. Statistics (min/max/average, popcounts, frequencies) are
+computed on the number column, with one popcount per distinct number.
+
+Example:
+    codes = NBCodeConverter().text_to_nb_codes(text)
+    codes[0].nb_code          # '1/00000001'
+    codes.total_bits()
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+FIELDS = ("char", "number", "binary", "nb_code", "bit_count")
+
+
+class NBCodeRecord:
+    """One character and its number; the code strings are formatted lazily."""
+
+    __slots__ = ("char", "number")
+
+    def __init__(self, char: str, number: int) -> None:
+        self.char = char
+        self.number = number
+
+    @property
+    def binary(self) -> str:
+        """8-bit (or wider) binary string"""
+        return format(self.number, "08b")
+
+    @property
+    def nb_code(self) -> str:
+        """n/b form: number/bits"""
+        return f"{self.number}/{self.binary}"
+
+    @property
+    def bit_count(self) -> int:
+        return bin(self.number).count("1")
+
+    def __getitem__(self, key: str) -> object:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NBCodeRecord):
+            return NotImplemented
+        return self.char == other.char and self.number == other.number
+
+    def __repr__(self) -> str:
+        return f"NBCodeRecord({self.char!r}, {self.number})"
+
+
+class NBCodeSequence:
+    """Character numbers of a text as one array column."""
+
+    __slots__ = ("numbers", "number_to_char")
+
+    def __init__(self, numbers: array, number_to_char: Dict[int, str]) -> None:
+        self.numbers = numbers
+        self.number_to_char = number_to_char  # shared with the converter, not copied
+
+    @classmethod
+    def from_text(
+        cls,
+        text: str,
+        assign_number: Callable[[str], int],
+        number_to_char: Dict[int, str],
+    ) -> "NBCodeSequence":
+        """Number every non-whitespace character of text"""
+        numbers = array("I")
+        append = numbers.append
+        known: Dict[str, int] = {}
+        for char in text:
+            number = known.get(char)
+            if number is None:
+                if not char.strip():
+                    continue
+                number = known[char] = assign_number(char)
+            append(number)
+        return cls(numbers, number_to_char)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index: int | slice) -> "NBCodeRecord | NBCodeSequence":
+        if isinstance(index, slice):
+            return NBCodeSequence(self.numbers[index], self.number_to_char)
+        number = self.numbers[index]
+        return NBCodeRecord(self.number_to_char[number], number)
+
+    def __iter__(self) -> Iterator[NBCodeRecord]:
+        table = self.number_to_char
+        for number in self.numbers:
+            yield NBCodeRecord(table[number], number)
+
+    def chars(self) -> str:
+        table = self.number_to_char
+        return "".join(table[number] for number in self.numbers)
+
+    def counts(self) -> Counter:
+        """Occurrences per number"""
+        return Counter(self.numbers)
+
+    def bit_counts(self) -> array:
+        """Popcount of every number, one byte each"""
+        popcounts = {number: bin(number).count("1") for number in set(self.numbers)}
+        return array("B", map(popcounts.__getitem__, self.numbers))
+
+    def total_bits(self) -> int:
+        return sum(bin(number).count("1") * count for number, count in self.counts().items())
+
+    def number_stats(self) -> Tuple[int, int, float]:
+        """(min, max, average) of the numbers; the sequence must not be empty"""
+        numbers = self.numbers
+        return min(numbers), max(numbers), sum(numbers) / len(numbers)
+
+    def to_dicts(self, fields: Iterable[str] = ("char", "number", "nb_code")) -> List[Dict[str, object]]:
+        """The old one-dict-per-character form, e.g. for JSON output"""
+        fields = tuple(fields)
+        return [{name: getattr(record, name) for name in fields} for record in self]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the number column"""
+        return self.numbers.itemsize * len(self.numbers)
+
+    def __repr__(self) -> str:
+        return f"NBCodeSequence({len(self)} chars)"
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""\
+Golden-output equivalence harness for alternate n/b engines.
+
+Runs the reference ``calculate_bit`` and one or more alternate engines over
+the same inputs and reports, per engine and dataset, the largest absolute and
+relative deviation together with the inputs that differ beyond the tolerance.
+
+Datasets:
+    voynich    unique tokens of data/voynich.nowhitespace.txt (pipeline tokenization)
+    english    unique words of the English lexicon in language_database
+    generated  seeded property arrays: empty/one/two-element arrays (the
+               ``len(nb) == 2`` branch), constant, negative, mixed-sign, float,
+               tiny/huge magnitudes, NaN/inf values and large ``bit`` values
+               that push results out of range (the SUPER_BIT fallback)
+
+Compared quantities:
+    forward / reverse  raw calculate_bit(nb, bit, reverse)
+    max / min          BIT_MAX_NB / BIT_MIN_NB over the dataset in order, so the
+                       SUPER_BIT fallback (last valid result) is part of the check
+
+The reference is slow on long tokens, so its results are cached as golden
+files in .cache/nb_golden, keyed by the reference source and the inputs.
+
+An engine is a name registered in advanced_nb_calculator (all registered
+alternates are compared by default) or ``module:attribute``. The attribute is
+either a calculate_bit-compatible function or an object with ``calculate_bit``
+and, optionally, ``bit_max_min_batch(arrays, bit)`` returning (max, min) pairs
+with the BIT_MAX_NB/BIT_MIN_NB semantics (including SUPER_BIT updates).
+
+Example:
+    python src/nb_equivalence.py
+    python src/nb_equivalence.py --engine numpy --engine my_engine:calculate_bit
+    python src/nb_equivalence.py --engine my_engine:ENGINE --datasets generated --cases 1000
+    python src/nb_equivalence.py --engine my_engine:ENGINE --rtol 1e-6 --json report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import advanced_nb_calculator
+from advanced_nb_calculator import calculate_bit, initialize_arrays, word_nb_unicode_format
+from language_database import LANGUAGE_DATABASE
+from voynich_nb_words_to_json import load_text, split_words
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+GOLDEN_DIR = ROOT_DIR / ".cache" / "nb_golden"
+CORPUS_PATH = "data/voynich.nowhitespace.txt"
+DATASETS = ("voynich", "english", "generated")
+QUANTITIES = ("forward", "reverse", "max", "min")
+DEFAULT_BIT = 5.5
+SEED = 1234
+DEFAULT_CASES = 400
+# Scripts used for random words in the generated dataset (all prefix ranges plus unprefixed ones)
+_WORD_ALPHABETS = (
+    "abcdefghijklmnopqrstuvwxyz",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "가나다라마바사아자차카타파하한국어",
+    "ひらがなカタカナ",
+    "中国語日本漢字",
+    "абвгдежзийклмн",
+    "אבגדהוזחט",
+    "àáâãèéêìíòóôùú",
+    "กขคงจฉช",
+    "0123456789_",
+)
+
+
+@dataclass
+class Case:
+    """One input array; label is the word or a short description."""
+
+    label: str
+    codes: List[float]
+    bit: float = DEFAULT_BIT
+
+
+@dataclass
+class Engine:
+    name: str
+    calculate_bit: Callable[..., float]
+    bit_max_min_batch: Callable[..., Sequence[Tuple[float, float]]] | None = None
+
+
+@dataclass
+class Comparison:
+    """Deviation of one engine from the reference for one dataset and quantity."""
+
+    engine: str
+    dataset: str
+    quantity: str
+    compared: int = 0
+    mismatches: int = 0
+    max_abs: float = 0.0
+    max_rel: float = 0.0
+    examples: List[Dict[str, object]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "engine": self.engine,
+            "dataset": self.dataset,
+            "quantity": self.quantity,
+            "compared": self.compared,
+            "mismatches": self.mismatches,
+            "max_abs": self.max_abs,
+            "max_rel": self.max_rel,
+            "examples": self.examples,
+        }
+
+
+def _unique(words: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(words))
+
+
+def voynich_cases(limit: int | None = None) -> List[Case]:
+    words = _unique(split_words(load_text(CORPUS_PATH)))[:limit]
+    return [Case(word, word_nb_unicode_format(word)) for word in words]
+
+
+def english_cases(limit: int | None = None) -> List[Case]:
+    words = _unique(LANGUAGE_DATABASE["영어"])[:limit]
+    return [Case(word, word_nb_unicode_format(word)) for word in words]
+
+
+def generated_cases(count: int = DEFAULT_CASES, seed: int = SEED) -> List[Case]:
+    """Seeded property arrays covering the branches of calculate_bit"""
+    rng = random.Random(seed)
+
+    def random_word() -> str:
+        alphabet = rng.choice(_WORD_ALPHABETS)
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 16)))
+
+    def floats(length: int, low: float, high: float) -> List[float]:
+        return [rng.uniform(low, high) for _ in range(length)]
+
+    cases = [
+        Case("empty", []),
+        Case("single", [rng.randint(0, 1000)]),
+        Case("pair/equal", [7, 7]),
+        Case("pair/zero", [0, 0]),
+        Case("pair/negative", [-3.5, -1.25]),
+        Case("pair/mixed", [-2, 9]),
+        Case("constant/zero", [0] * 6),
+        Case("nan", [1.0, float("nan"), 3.0]),
+        Case("inf", [1.0, float("inf"), 3.0]),
+        Case("-inf", [float("-inf"), 2.0, 3.0]),
+        Case("huge", [1e308, -1e308, 5e307]),
+        Case("bit/large", [1, 2, 3, 4], bit=5000.0),
+        Case("bit/negative", [1, 2, 3, 4], bit=-5000.0),
+    ]
+    generators: List[Callable[[], Case]] = [
+        lambda: Case("word", word_nb_unicode_format(random_word())),
+        lambda: Case("pair", floats(2, -1000, 1000)),
+        lambda: Case("pair/int", [rng.randint(0, 10**7) for _ in range(2)]),
+        lambda: Case("short", [rng.randint(-50, 50) for _ in range(rng.randint(0, 4))]),
+        lambda: Case("constant", [rng.uniform(-100, 100)] * rng.randint(2, 12)),
+        lambda: Case("negative", floats(rng.randint(2, 24), -10**6, -1e-3)),
+        lambda: Case("mixed", floats(rng.randint(2, 24), -10**6, 10**6)),
+        lambda: Case("mixed/int", [rng.randint(-9, 9) for _ in range(rng.randint(2, 30))]),
+        lambda: Case("tiny", floats(rng.randint(2, 12), -1e-300, 1e-300)),
+        lambda: Case("huge", floats(rng.randint(2, 12), -1e307, 1e307)),
+        lambda: Case("codes/long", word_nb_unicode_format(random_word() * 4)),
+        lambda: Case("bit", floats(rng.randint(2, 10), 0, 100), bit=rng.choice([0.0, 1.0, 50.0, 250.0, 1e4])),
+    ]
+    while len(cases) < count:
+        cases.append(rng.choice(generators)())
+    for index, case in enumerate(cases):
+        case.label = f"#{index} {case.label}"
+    return cases[:count]
+
+
+def build_dataset(name: str, limit: int | None, cases: int) -> List[Case]:
+    if name == "voynich":
+        return voynich_cases(limit)
+    if name == "english":
+        return english_cases(limit)
+    if name == "generated":
+        return generated_cases(cases)
+    raise ValueError(f"unknown dataset: {name}")
+
+
+def reference_fingerprint() -> str:
+    """Changes whenever the reference implementation changes"""
+    digest = hashlib.sha256()
+    for func in (calculate_bit, initialize_arrays):
+        digest.update(inspect.getsource(func).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cases_fingerprint(cases: Sequence[Case]) -> str:
+    payload = json.dumps([[case.codes, case.bit] for case in cases])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _run_raw(func: Callable[..., float], cases: Sequence[Case]) -> List[Tuple[float, float]]:
+    return [(func(case.codes, case.bit, False), func(case.codes, case.bit, True)) for case in cases]
+
+
+def golden_results(
+    dataset: str,
+    cases: Sequence[Case],
+    refresh: bool = False,
+    directory: Path = GOLDEN_DIR,
+) -> List[Tuple[float, float]]:
+    """Reference (forward, reverse) results, loaded from or saved to the golden cache"""
+    key = {"reference": reference_fingerprint(), "cases": cases_fingerprint(cases)}
+    path = directory / f"{dataset}.json"
+    if not refresh:
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+            if stored.get("key") == key:
+                return [tuple(pair) for pair in stored["results"]]
+        except (OSError, ValueError):
+            pass
+
+    results = _run_raw(calculate_bit, cases)
+    directory.mkdir(parents=True, exist_ok=True)
+    # json keeps floats exactly (repr round-trip) and writes NaN/Infinity literally
+    path.write_text(json.dumps({"key": key, "results": results}), encoding="utf-8")
+    return results
+
+
+def _valid(result: float) -> bool:
+    return math.isfinite(result) and -100 <= result <= 100
+
+
+def super_bit_sequence(raw: Sequence[Tuple[float, float]], start: float = 0.0) -> List[Tuple[float, float]]:
+    """(BIT_MAX_NB, BIT_MIN_NB) for each case in order, from raw (forward, reverse) results
+
+    Mirrors the wrappers: an out-of-range or non-finite result returns the last
+    valid result (SUPER_BIT), a valid one replaces it.
+    """
+    super_bit = start
+    sequence = []
+    for forward, reverse in raw:
+        if _valid(forward):
+            super_bit = forward
+        nb_max = super_bit
+        if _valid(reverse):
+            super_bit = reverse
+        sequence.append((nb_max, super_bit))
+    return sequence
+
+
+def _run_batch(engine: Engine, cases: Sequence[Case]) -> List[Tuple[float, float]]:
+    """Run an engine's batch entry point over runs of cases that share a bit value"""
+    advanced_nb_calculator.update_super_bit(0.0)
+    results: List[Tuple[float, float]] = []
+    start = 0
+    while start < len(cases):
+        end = start
+        while end < len(cases) and cases[end].bit == cases[start].bit:
+            end += 1
+        batch = engine.bit_max_min_batch([case.codes for case in cases[start:end]], cases[start].bit)
+        results.extend((float(nb_max), float(nb_min)) for nb_max, nb_min in batch)
+        start = end
+    return results
+
+
+def values_match(expected: float, actual: float, rtol: float = 0.0, atol: float = 0.0) -> bool:
+    if math.isnan(expected) or math.isnan(actual):
+        return math.isnan(expected) and math.isnan(actual)
+    if expected == actual:
+        return True
+    if math.isinf(expected) or math.isinf(actual):
+        return False
+    return abs(actual - expected) <= atol + rtol * abs(expected)
+
+
+def deviation(expected: float, actual: float) -> Tuple[float, float]:
+    """(absolute, relative) difference; inf when only one side is finite or NaN"""
+    if math.isnan(expected) and math.isnan(actual) or expected == actual:
+        return 0.0, 0.0
+    if not (math.isfinite(expected) and math.isfinite(actual)):
+        return math.inf, math.inf
+    diff = abs(actual - expected)
+    return diff, diff / abs(expected) if expected else math.inf
+
+
+def _short(codes: Sequence[float], limit: int = 8) -> str:
+    shown = ", ".join(repr(value) for value in codes[:limit])
+    return f"[{shown}{', ...' if len(codes) > limit else ''}] (len {len(codes)})"
+
+
+def compare_values(
+    comparison: Comparison,
+    cases: Sequence[Case],
+    expected: Sequence[float],
+    actual: Sequence[float],
+    rtol: float,
+    atol: float,
+    show: int,
+) -> Comparison:
+    if len(actual) != len(expected):
+        raise ValueError(
+            f"{comparison.engine} returned {len(actual)} {comparison.quantity} results for {len(expected)} inputs"
+        )
+    for case, want, got in zip(cases, expected, actual):
+        comparison.compared += 1
+        abs_dev, rel_dev = deviation(want, got)
+        comparison.max_abs = max(comparison.max_abs, abs_dev)
+        comparison.max_rel = max(comparison.max_rel, rel_dev)
+        if values_match(want, got, rtol, atol):
+            continue
+        comparison.mismatches += 1
+        if len(comparison.examples) < show:
+            comparison.examples.append(
+                {"input": case.label, "codes": _short(case.codes), "bit": case.bit, "expected": want, "actual": got}
+            )
+    return comparison
+
+
+def resolve_engine(spec: str) -> Engine:
+    """Load a registered engine by name, or any engine from ``module:attribute``"""
+    if spec in advanced_nb_calculator.engine_names():
+        target = advanced_nb_calculator.create_engine(spec)
+        return Engine(spec, target.calculate_bit, target.bit_max_min_batch)
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"engine must be a registered name or module:attribute, got {spec!r}")
+    target = getattr(importlib.import_module(module_name), attribute)
+    if hasattr(target, "calculate_bit"):
+        return Engine(spec, target.calculate_bit, getattr(target, "bit_max_min_batch", None))
+    if callable(target):
+        return Engine(spec, target)
+    raise TypeError(f"{spec} is neither a calculate_bit function nor an engine object")
+
+
+def compare_engine(
+    engine: Engine,
+    dataset: str,
+    cases: Sequence[Case],
+    golden: Sequence[Tuple[float, float]],
+    rtol: float = 0.0,
+    atol: float = 0.0,
+    show: int = 10,
+) -> List[Comparison]:
+    """Compare one engine with the golden results on every quantity"""
+    raw = _run_raw(engine.calculate_bit, cases)
+    if engine.bit_max_min_batch is not None:
+        sequence = _run_batch(engine, cases)
+    else:
+        sequence = super_bit_sequence(raw)
+    reference_sequence = super_bit_sequence(golden)
+
+    columns = {
+        "forward": ([pair[0] for pair in golden], [pair[0] for pair in raw]),
+        "reverse": ([pair[1] for pair in golden], [pair[1] for pair in raw]),
+        "max": ([pair[0] for pair in reference_sequence], [pair[0] for pair in sequence]),
+        "min": ([pair[1] for pair in reference_sequence], [pair[1] for pair in sequence]),
+    }
+    return [
+        compare_values(Comparison(engine.name, dataset, quantity), cases, *columns[quantity], rtol, atol, show)
+        for quantity in QUANTITIES
+    ]
+
+
+def print_comparisons(comparisons: Sequence[Comparison]) -> None:
+    width = max([len("engine")] + [len(item.engine) for item in comparisons]) + 2
+    print(f"\n{'engine':<{width}}{'dataset':<11}{'quantity':<9}{'inputs':>8}{'diff':>7}{'max abs':>12}{'max rel':>12}")
+    for item in comparisons:
+        print(
+            f"{item.engine:<{width}}{item.dataset:<11}{item.quantity:<9}{item.compared:>8}"
+            f"{item.mismatches:>7}{item.max_abs:>12.3e}{item.max_rel:>12.3e}"
+        )
+    for item in comparisons:
+        for example in item.examples:
+            print(
+                f"  {item.engine} {item.dataset}/{item.quantity} {example['input']!r}: "
+                f"expected {example['expected']!r}, got {example['actual']!r} "
+                f"(bit {example['bit']}, codes {example['codes']})"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare alternate n/b engines with the reference calculate_bit")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        default=None,
+        help="Registered engine name or module:attribute (repeatable; default: every registered alternate)",
+    )
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS), help="Datasets to run")
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N unique words of each lexicon")
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES, help="Number of generated property cases")
+    parser.add_argument("--rtol", type=float, default=0.0, help="Relative tolerance (default: exact)")
+    parser.add_argument("--atol", type=float, default=0.0, help="Absolute tolerance (default: exact)")
+    parser.add_argument("--show", type=int, default=10, help="Mismatching inputs listed per quantity")
+    parser.add_argument("--refresh", action="store_true", help="Recompute the golden reference results")
+    parser.add_argument("--json", default=None, help="Also write the comparison to this JSON path")
+    args = parser.parse_args()
+
+    specs = args.engine or [name for name in advanced_nb_calculator.engine_names() if name != "reference"]
+    engines = []
+    for spec in specs:
+        try:
+            engines.append(resolve_engine(spec))
+        except ImportError as exc:
+            print(f"Skipping engine {spec}: {exc}")
+    comparisons: List[Comparison] = []
+    for dataset in args.datasets:
+        cases = build_dataset(dataset, args.limit, args.cases)
+        started = time.perf_counter()
+        golden = golden_results(dataset, cases, refresh=args.refresh)
+        print(f"{dataset}: {len(cases)} inputs, reference ready in {time.perf_counter() - started:.1f}s")
+        for engine in engines:
+            started = time.perf_counter()
+            comparisons += compare_engine(engine, dataset, cases, golden, args.rtol, args.atol, args.show)
+            print(f"  {engine.name}: {time.perf_counter() - started:.1f}s")
+
+    print_comparisons(comparisons)
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps([item.as_dict() for item in comparisons], ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    failed = sum(item.mismatches for item in comparisons)
+    if failed:
+        print(f"\n{failed} result(s) outside rtol={args.rtol:g}, atol={args.atol:g}")
+        return 1
+    print(f"\nAll engines match the reference (rtol={args.rtol:g}, atol={args.atol:g})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
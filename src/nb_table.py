@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""\
+Columnar n/b feature table for matching.
+
+The n/b JSON files hold one dict per word (word, nb_max, nb_min, nb_codes).
+NBTable keeps what matching reads as numpy columns: the words and
+nb_max/nb_min in the chosen precision, so matching scans contiguous arrays
+instead of dicts.
+
+The nb_codes are deliberately not stored: match_words scores on nb_max and
+nb_min only, and an int32 code column (with per-word offsets) cost memory and
+load time without any reader. Add it back only together with a consumer.
+
+Precision:
+    float64  exact; the same scores as the dict-based matcher
+    float32  half the memory bandwidth for nb_max/nb_min. n/b values lie in
+             [-100, 100] (values outside fall back to SUPER_BIT), so each
+             stored value is off by at most half an ulp at 64..128 (3.8e-6) and a
+             score |dmax| + |dmin| (+ 0.5 repeat penalty, at most 400.5) by at
+             most FLOAT32_SCORE_TOLERANCE. Only picks whose float64 scores are
+             that close can change.
+
+Example:
+    table = NBTable.from_items(load_json("outputs/english_nb_words.json")["words"], "float32")
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+PRECISIONS = ("float64", "float32")
+# 4 input roundings (4 * 3.8e-6) + 4 arithmetic roundings at |x| < 512 (4 * 1.5e-5), rounded up
+FLOAT32_SCORE_TOLERANCE = 1e-4
+
+
+def _dtype(precision: str):
+    if np is None:
+        raise ImportError("numpy is required for NBTable")
+    if precision not in PRECISIONS:
+        raise ValueError(f"unsupported precision: {precision} (choose from {', '.join(PRECISIONS)})")
+    return np.dtype(precision)
+
+
+@dataclass
+class NBTable:
+    """Words (a list) with their nb_max and nb_min as numpy columns."""
+
+    words: List[str]
+    nb_max: "np.ndarray"
+    nb_min: "np.ndarray"
+
+    @classmethod
+    def from_items(cls, items: Sequence[Dict[str, object]], precision: str = "float64") -> "NBTable":
+        dtype = _dtype(precision)
+        return cls(
+            words=[str(item["word"]) for item in items],
+            nb_max=np.fromiter((item["nb_max"] for item in items), dtype=dtype, count=len(items)),
+            nb_min=np.fromiter((item["nb_min"] for item in items), dtype=dtype, count=len(items)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def precision(self) -> str:
+        return self.nb_max.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the numeric columns"""
+        return self.nb_max.nbytes + self.nb_min.nbytes
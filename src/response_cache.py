@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""\
+Persistent, content-addressed cache for GPT chat completion responses.
+
+Responses are keyed by a hash of (model, messages, temperature) and stored in
+a local SQLite file, so re-running the pipeline re-uses earlier answers
+instead of issuing the same prompts again.
+
+Environment variables:
+    GPT_CACHE_DISABLE      set to 1 to bypass the cache
+    GPT_CACHE_PATH         SQLite file (default: .cache/gpt_responses.sqlite3)
+    GPT_CACHE_TTL          entry lifetime in seconds (default: 30 days)
+    GPT_CACHE_MAX_ENTRIES  entries kept before the least recently used are dropped
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_PATH = ROOT_DIR / ".cache" / "gpt_responses.sqlite3"
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def cache_key(payload: Dict) -> str:
+    """Hash of model + messages + temperature for a chat completion payload"""
+    material = json.dumps(
+        {
+            "model": payload.get("model"),
+            "messages": payload.get("messages"),
+            "temperature": payload.get("temperature"),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and an entry-count limit."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, payload: Dict) -> str | None:
+        """Return the cached response for a payload, or None if missing or expired"""
+        key = cache_key(payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, payload: Dict, response: str) -> None:
+        """Store a response and drop the least recently used entries over the limit"""
+        key = cache_key(payload)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload.get("model"), response, now, now),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Remove expired entries and return how many were deleted"""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: ResponseCache | None = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Shared cache configured from the environment (None when disabled)"""
+    global _default_cache
+    if os.getenv("GPT_CACHE_DISABLE", "").strip() not in ("", "0"):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache(
+                    os.getenv("GPT_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                    ttl=float(os.getenv("GPT_CACHE_TTL", DEFAULT_TTL)),
+                    max_entries=int(os.getenv("GPT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                )
+            except (OSError, sqlite3.Error):
+                # An unusable cache location should never stop the pipeline
+                return None
+        return _default_cache
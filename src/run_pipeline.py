@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""\
+Run the Voynich pipeline with incremental, dependency-aware rebuilds.
+
+Each step declares the files it reads (data, source modules, intermediate
+outputs) and the files it writes. A step is skipped when the content hashes
+of all its inputs and outputs match the last successful run; steps whose
+inputs are ready run concurrently. State is kept in .cache/pipeline_state.json.
+
+Steps:
+    voynich_nb_words   data/voynich.nowhitespace.txt -> outputs/voynich_nb_words.json
+    english_nb_words   language_database.py          -> outputs/english_nb_words.json
+    match              both n/b JSON files            -> voynich_to_english_sentence.txt + match artifact
+    interpretation     match artifact                 -> voynich_interpretation.html
+    index              match artifact + story         -> index.html
+
+Example:
+    python src/run_pipeline.py
+    python src/run_pipeline.py --dry-run
+    python src/run_pipeline.py --force --only match
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Set
+
+from instrumentation import RunReport, peak_rss_mb
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STATE_PATH = ROOT_DIR / ".cache" / "pipeline_state.json"
+
+
+@dataclass
+class Step:
+    """One pipeline command with the files it reads and writes (relative to ROOT_DIR)."""
+
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+    def command(self) -> List[str]:
+        return [sys.executable, str(ROOT_DIR / self.script), *self.args]
+
+
+NB_ENGINE = ["src/advanced_nb_calculator.py"]
+HTML_COMMON = ["src/html_stream.py", "src/match_artifact.py", "src/generate_index_html.py"]
+MATCH_ARTIFACT = "outputs/voynich_to_english_matches.bin"
+LLM_CLIENT = ["src/llm_client.py", "src/response_cache.py"]
+INSTRUMENTATION = ["src/instrumentation.py"]  # imported by every step script
+
+STEPS: List[Step] = [
+    Step(
+        "voynich_nb_words",
+        "src/voynich_nb_words_to_json.py",
+        ["--input", "data/voynich.nowhitespace.txt", "--output", "outputs/voynich_nb_words.json"],
+        inputs=[
+            "data/voynich.nowhitespace.txt",
+            "src/voynich_nb_words_to_json.py",
+            "src/voynich_corpus.py",
+            *NB_ENGINE,
+            *INSTRUMENTATION,
+        ],
+        outputs=["outputs/voynich_nb_words.json"],
+    ),
+    Step(
+        "english_nb_words",
+        "src/english_nb_words_to_json.py",
+        ["--output", "outputs/english_nb_words.json"],
+        inputs=["src/language_database.py", "src/english_nb_words_to_json.py", *NB_ENGINE, *INSTRUMENTATION],
+        outputs=["outputs/english_nb_words.json"],
+    ),
+    Step(
+        "match",
+        "src/english_sentence_from_nb_json.py",
+        inputs=[
+            "outputs/voynich_nb_words.json",
+            "outputs/english_nb_words.json",
+            "src/english_sentence_from_nb_json.py",
+            "src/match_artifact.py",
+            "src/nb_table.py",
+            *LLM_CLIENT,
+            *INSTRUMENTATION,
+        ],
+        outputs=["outputs/voynich_to_english_sentence.txt", MATCH_ARTIFACT],
+    ),
+    Step(
+        "interpretation",
+        "src/voynich_html_generator.py",
+        inputs=[
+            MATCH_ARTIFACT,
+            "src/voynich_html_generator.py",
+            "src/match_artifact.py",
+            *LLM_CLIENT,
+            *INSTRUMENTATION,
+        ],
+        outputs=["voynich_interpretation.html"],
+    ),
+    Step(
+        "index",
+        "src/index_renderer.py",
+        inputs=[
+            MATCH_ARTIFACT,
+            "outputs/voynich_gpt_story.txt",
+            "templates/index.html",
+            "src/index_renderer.py",
+            *HTML_COMMON,
+            *INSTRUMENTATION,
+        ],
+        outputs=["index.html"],
+    ),
+]
+
+
+def file_hash(path: Path) -> str | None:
+    """SHA-256 of a file's content, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def step_fingerprint(step: Step) -> Dict[str, object]:
+    """Hashes of everything that determines a step's result"""
+    return {
+        "command": step.args,
+        "inputs": {name: file_hash(ROOT_DIR / name) for name in step.inputs},
+    }
+
+
+def output_hashes(step: Step) -> Dict[str, str | None]:
+    return {name: file_hash(ROOT_DIR / name) for name in step.outputs}
+
+
+def load_state(path: Path = STATE_PATH) -> Dict[str, Dict]:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict[str, Dict], path: Path = STATE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def producers(steps: List[Step]) -> Dict[str, Set[str]]:
+    """step name -> names of the steps that write one of its inputs"""
+    writer = {output: step.name for step in steps for output in step.outputs}
+    return {
+        step.name: {writer[name] for name in step.inputs if name in writer and writer[name] != step.name}
+        for step in steps
+    }
+
+
+def is_up_to_date(step: Step, state: Dict[str, Dict]) -> bool:
+    """True when inputs, command and outputs all match the last successful run"""
+    previous = state.get(step.name)
+    if not previous:
+        return False
+    if previous.get("fingerprint") != step_fingerprint(step):
+        return False
+    outputs = output_hashes(step)
+    return None not in outputs.values() and previous.get("outputs") == outputs
+
+
+def run_step(step: Step) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    return subprocess.run(
+        step.command(),
+        cwd=str(ROOT_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+
+
+def run_pipeline(
+    steps: List[Step] = STEPS,
+    only: Set[str] | None = None,
+    force: bool = False,
+    jobs: int = 2,
+    dry_run: bool = False,
+    report: RunReport | None = None,
+) -> int:
+    """Run out-of-date steps in dependency order; returns the number of failed steps"""
+    report = report or RunReport("pipeline")
+    state = load_state()
+    deps = producers(steps)
+    by_name = {step.name: step for step in steps}
+    selected = set(only) if only else set(by_name)
+
+    pending = [step.name for step in steps if step.name in selected]
+    done: Set[str] = set(by_name) - selected
+    rebuilt: Set[str] = set()
+    failed: Set[str] = set()
+    running: Dict[Future, str] = {}
+    started: Dict[str, float] = {}
+
+    def settle(name: str) -> None:
+        pending.remove(name)
+        done.add(name)
+
+    def timed_run(step: Step) -> subprocess.CompletedProcess:
+        with report.stage(step.name):
+            return run_step(step)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for name in list(pending):
+                if name in running.values() or not deps[name] <= done:
+                    continue
+                step = by_name[name]
+                if deps[name] & failed:
+                    print(f"[skip] {name}: depends on a failed step")
+                    report.count("steps_blocked")
+                    failed.add(name)
+                    settle(name)
+                    continue
+                # Upstream reruns are picked up through the input hashes; a dry run
+                # cannot see those, so it assumes every dependent of a rerun changes
+                stale = force or (dry_run and bool(deps[name] & rebuilt)) or not is_up_to_date(step, state)
+                if not stale:
+                    print(f"[ok]   {name}: up to date")
+                    report.count("steps_up_to_date")
+                    settle(name)
+                    continue
+                if dry_run:
+                    print(f"[run]  {name}: {' '.join(step.command()[1:])}")
+                    rebuilt.add(name)
+                    settle(name)
+                    continue
+                print(f"[run]  {name}")
+                started[name] = time.perf_counter()
+                running[executor.submit(timed_run, step)] = name
+
+            if not running:
+                continue
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                step = by_name[name]
+                elapsed = time.perf_counter() - started[name]
+                try:
+                    result = future.result()
+                    output, returncode = result.stdout + result.stderr, result.returncode
+                except OSError as exc:
+                    output, returncode = str(exc), -1
+                for line in output.splitlines():
+                    print(f"    {name} | {line}")
+                if returncode == 0:
+                    state[name] = {"fingerprint": step_fingerprint(step), "outputs": output_hashes(step)}
+                    save_state(state)
+                    rebuilt.add(name)
+                    report.count("steps_run")
+                    print(f"[done] {name} ({elapsed:.1f}s)")
+                else:
+                    failed.add(name)
+                    report.count("steps_failed")
+                    state.pop(name, None)
+                    save_state(state)
+                    print(f"[fail] {name}: exit code {returncode} ({elapsed:.1f}s)")
+                settle(name)
+
+    report.metric("peak_child_rss_mb", peak_rss_mb(children=True))
+    if not dry_run:
+        report.write()
+    return len(failed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Incremental Voynich pipeline runner")
+    parser.add_argument("--only", nargs="+", choices=[step.name for step in STEPS], help="Run only these steps")
+    parser.add_argument("--force", action="store_true", help="Re-run steps even if inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=2, help="Steps run concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="Show which steps would run")
+    parser.add_argument("--list", action="store_true", help="List steps with their inputs and outputs")
+    args = parser.parse_args()
+
+    if args.list:
+        for step in STEPS:
+            print(f"{step.name}:")
+            print(f"  inputs:  {', '.join(step.inputs)}")
+            print(f"  outputs: {', '.join(step.outputs)}")
+        return 0
+
+    failures = run_pipeline(STEPS, set(args.only or ()), args.force, args.jobs, args.dry_run)
+    if failures:
+        print(f"\n{failures} step(s) failed")
+        return 1
+    print("\nPipeline completed")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,7 +5,8 @@ Simple test script to diagnose GPT API issues
 
 import json
 import os
-import urllib.request
+
+from llm_client import LLMClient, LLMError
 
 api_key = os.getenv("OPENAI_API_KEY")
 print(f"API Key present: {bool(api_key)}")
@@ -34,25 +35,15 @@ print(f"  - Messages: {len(payload['messages'])} messages")
 print(f"  - Content length: {len(test_sentence)} chars")
 print()
 
-try:
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
+client = LLMClient(cache=None)
+print(f"Base URL: {client.base_url}")
+print()
 
+try:
     print("Sending request to OpenAI API...")
-    with urllib.request.urlopen(request, timeout=60) as response:
-        body = response.read().decode("utf-8")
-        print(f"Response received: {len(body)} bytes")
-        print()
-
-    parsed = json.loads(body)
+    parsed = client.complete(payload, timeout=60)
+    print(f"Response received: {client.metrics.latency_total:.2f}s, {client.metrics.total_tokens} tokens")
+    print()
     
     if "choices" in parsed and len(parsed["choices"]) > 0:
         translation = parsed["choices"][0]["message"]["content"].strip()
@@ -62,10 +53,11 @@ try:
         print(f"✗ Unexpected response structure")
         print(json.dumps(parsed, ensure_ascii=False, indent=2))
         
-except json.JSONDecodeError as e:
-    print(f"✗ JSON parsing error: {e}")
-except urllib.error.HTTPError as e:
-    print(f"✗ HTTP error: {e.code}")
-    print(f"  Error body: {e.read().decode('utf-8')}")
-except Exception as e:
-    print(f"✗ Error: {type(e).__name__}: {e}")
+except LLMError as e:
+    if e.status is not None:
+        print(f"✗ HTTP error: {e.status}")
+        print(f"  Error body: {e.body}")
+    else:
+        print(f"✗ Error: {e}")
+finally:
+    client.close()
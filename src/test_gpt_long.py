@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
-import json
 import os
-import urllib.request
+
+from llm_client import LLMClient, LLMError
 
 api_key = os.getenv("OPENAI_API_KEY")
 
@@ -21,31 +21,22 @@ payload = {
     "temperature": 0.2,
 }
 
+client = LLMClient(api_key=api_key, cache=None)
+
 try:
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
-    
     print("Calling API...")
-    with urllib.request.urlopen(request, timeout=60) as response:
-        body = response.read().decode("utf-8")
-        parsed = json.loads(body)
-        
-        if "error" in parsed:
-            print(f"API Error: {parsed['error']}")
-        elif "choices" in parsed and parsed["choices"]:
-            translation = parsed["choices"][0]["message"]["content"].strip()
-            print(f"SUCCESS:")
-            print(translation[:200])
-        else:
-            print("Unexpected response:", str(parsed)[:300])
+    parsed = client.complete(payload, timeout=60)
+    
+    if "error" in parsed:
+        print(f"API Error: {parsed['error']}")
+    elif "choices" in parsed and parsed["choices"]:
+        translation = parsed["choices"][0]["message"]["content"].strip()
+        print(f"SUCCESS:")
+        print(translation[:200])
+    else:
+        print("Unexpected response:", str(parsed)[:300])
             
-except Exception as e:
-    print(f"Exception: {type(e).__name__}: {str(e)[:200]}")
+except LLMError as e:
+    print(f"Exception: {type(e).__name__}: {str(e)[:200]} {e.body[:200]}")
+finally:
+    client.close()
@@ -7,6 +7,15 @@
 - 고급 비트 계산 및 코사인 유사도
 """
 
+import math
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy는 선택 사항
+    np = None
+
 from advanced_nb_calculator import (
     BIT_MAX_NB, BIT_MIN_NB,
     word_nb_unicode_format,
@@ -17,6 +26,56 @@ from advanced_nb_calculator import (
     levenshtein,
     identify_language
 )
+from nb_code_records import NBCodeSequence
+
+# 0~255 각 바이트의 1 비트 수 (numpy popcount 표)
+_POPCOUNT_TABLE = None if np is None else np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+@dataclass
+class NBCodeStatistics:
+    """n/b 코드 통계 결과 (출력과 분리)"""
+    count: int                  # 문자 수
+    unique_chars: int           # 변환기에 등록된 고유 문자 수
+    min_number: int
+    max_number: int
+    avg_number: float
+    min_bits: int               # 번호의 1 비트 수 최소/최대/평균/합계
+    max_bits: int
+    avg_bits: float
+    total_bits: int
+    normalized: Sequence[float]  # MIN-MAX 정규화 값 (문자 순서)
+    frequencies: List[Tuple[int, int]]  # (번호, 횟수), 횟수 내림차순
+
+    @property
+    def range(self):
+        return self.max_number - self.min_number
+
+    @property
+    def complexity(self):
+        """복잡도 지수: 문자당 평균 비트 수"""
+        return self.total_bits / self.count
+
+
+def _statistics_from_sequence(codes, unique_chars):
+    """numpy 없이 NBCodeSequence의 array 열로 통계 계산"""
+    min_num, max_num, avg_num = codes.number_stats()
+    bit_counts = codes.bit_counts()
+    total_bits = sum(bit_counts)
+    span = max_num - min_num
+    return NBCodeStatistics(
+        count=len(codes),
+        unique_chars=unique_chars,
+        min_number=min_num,
+        max_number=max_num,
+        avg_number=avg_num,
+        min_bits=min(bit_counts),
+        max_bits=max(bit_counts),
+        avg_bits=total_bits / len(bit_counts),
+        total_bits=total_bits,
+        normalized=[(num - min_num) / span if span else 0 for num in codes.numbers],
+        frequencies=codes.counts().most_common(),
+    )
 
 class NBCodeConverter:
     """n/b (숫자/비트) 코드 변환기"""
@@ -44,25 +103,20 @@ class NBCodeConverter:
         return f"{number}/{binary}"
     
     def text_to_nb_codes(self, text):
-        """텍스트를 n/b 코드 배열로 변환"""
-        codes = []
-        for char in text:
-            if char.strip():  # 공백 제외
-                code = self.char_to_nb_code(char)
-                codes.append({
-                    'char': char,
-                    'number': self.char_to_number[char],
-                    'nb_code': code
-                })
-        return codes
+        """텍스트를 n/b 코드 배열로 변환 (공백 제외)
+
+        문자 번호를 array 한 열로 담은 NBCodeSequence를 반환한다. 각 항목은
+        NBCodeRecord이며 n/b 코드 문자열은 접근할 때 만든다.
+        """
+        return NBCodeSequence.from_text(text, self.assign_number, self.number_to_char)
     
     def get_pattern_signature(self, text):
         """텍스트의 패턴 시그니처 생성 (매칭용)"""
         codes = self.text_to_nb_codes(text)
         # 숫자 패턴
-        number_pattern = [c['number'] for c in codes]
+        number_pattern = codes.numbers.tolist()
         # 비트 합계
-        bit_sum = sum(bin(c['number']).count('1') for c in codes)
+        bit_sum = codes.total_bits()
         return {
             'length': len(codes),
             'pattern': number_pattern,
@@ -77,21 +131,28 @@ class VoynichAnalyzer:
     def __init__(self):
         self.converter = NBCodeConverter()
         self.voynich_text = ""
-        self.voynich_codes = []
+        self.voynich_codes = self.converter.text_to_nb_codes("")
         
-    def load_voynich_text(self, text):
-        """보이니치 텍스트 로드 및 번호 부여"""
+    def load_voynich_text(self, text, quiet=False):
+        """보이니치 텍스트 로드 및 번호 부여
+
+        quiet=True이면 문자별 목록과 통계를 출력하지 않는다 (큰 입력용).
+        통계는 compute_statistics()로 따로 얻을 수 있다.
+        """
         self.voynich_text = text
-        print(f"\n=== 보이니치 문서 분석 ===")
-        print(f"총 문자 수: {len(text)}\n")
         
         # 각 문자에 번호 부여 및 n/b 코드 변환
         self.voynich_codes = self.converter.text_to_nb_codes(text)
+        if quiet:
+            return self.voynich_codes
+        
+        print(f"\n=== 보이니치 문서 분석 ===")
+        print(f"총 문자 수: {len(text)}\n")
         
         # 결과 출력
         print("문자별 번호 및 n/b 코드:")
         for i, item in enumerate(self.voynich_codes, 1):  # 모든 문자 출력
-            print(f"{i:3d}. '{item['char']}' → 번호: {item['number']:3d} → n/b: {item['nb_code']}")
+            print(f"{i:3d}. '{item.char}' → 번호: {item.number:3d} → n/b: {item.nb_code}")
         
         # 통계 정보 계산
         print(f"\n{'='*60}")
@@ -101,63 +162,80 @@ class VoynichAnalyzer:
         
         return self.voynich_codes
     
-    def _print_statistics(self):
-        """n/b 코드 통계 정보 출력"""
-        if not self.voynich_codes:
-            return
+    def compute_statistics(self):
+        """n/b 코드 통계 계산 (출력 없음). 코드가 없으면 None"""
+        codes = self.voynich_codes
+        if not codes:
+            return None
+        if np is None:
+            return _statistics_from_sequence(codes, len(self.converter.char_to_number))
         
-        # 번호 추출
-        numbers = [item['number'] for item in self.voynich_codes]
+        # 번호 열을 복사 없이 numpy 배열로 보고 한 번씩만 훑는다
+        numbers = np.frombuffer(codes.numbers, dtype=np.uintc)
+        min_num = int(numbers.min())
+        max_num = int(numbers.max())
         
-        # 기본 통계
-        max_num = max(numbers)
-        min_num = min(numbers)
-        avg_num = sum(numbers) / len(numbers)
+        # 비트 수: 바이트별 popcount 표를 찾아 더함
+        bit_counts = _POPCOUNT_TABLE[numbers.view(np.uint8)].reshape(len(numbers), -1).sum(axis=1)
         
-        # 비트 수 계산
-        bit_counts = [bin(num).count('1') for num in numbers]
-        max_bits = max(bit_counts)
-        min_bits = min(bit_counts)
-        avg_bits = sum(bit_counts) / len(bit_counts)
-        total_bits = sum(bit_counts)
+        # 빈도: 횟수 내림차순, 같으면 먼저 나온 번호 순 (Counter.most_common과 같은 순서)
+        unique, first_index, counts = np.unique(numbers, return_index=True, return_counts=True)
+        order = np.lexsort((first_index, -counts))
         
-        # 정규화 값 (0~1 범위)
-        normalized = [(num - min_num) / (max_num - min_num) if max_num != min_num else 0 
-                      for num in numbers]
+        span = max_num - min_num
+        return NBCodeStatistics(
+            count=len(numbers),
+            unique_chars=len(self.converter.char_to_number),
+            min_number=min_num,
+            max_number=max_num,
+            avg_number=int(numbers.sum(dtype=np.uint64)) / len(numbers),
+            min_bits=int(bit_counts.min()),
+            max_bits=int(bit_counts.max()),
+            avg_bits=int(bit_counts.sum()) / len(numbers),
+            total_bits=int(bit_counts.sum()),
+            normalized=(numbers - min_num) / span if span else np.zeros(len(numbers)),
+            frequencies=list(zip(unique[order].tolist(), counts[order].tolist())),
+        )
+    
+    def _print_statistics(self, stats=None):
+        """n/b 코드 통계 정보 출력"""
+        if stats is None:
+            stats = self.compute_statistics()
+        if stats is None:
+            return
+        numbers = self.voynich_codes.numbers
         
         print(f"\n🔢 번호 통계:")
-        print(f"   최소값(MIN): {min_num}")
-        print(f"   최대값(MAX): {max_num}")
-        print(f"   평균값(AVG): {avg_num:.2f}")
-        print(f"   범위(RANGE): {max_num - min_num}")
+        print(f"   최소값(MIN): {stats.min_number}")
+        print(f"   최대값(MAX): {stats.max_number}")
+        print(f"   평균값(AVG): {stats.avg_number:.2f}")
+        print(f"   범위(RANGE): {stats.range}")
         
         print(f"\n💾 비트 통계:")
-        print(f"   최소 비트 수: {min_bits}")
-        print(f"   최대 비트 수: {max_bits}")
-        print(f"   평균 비트 수: {avg_bits:.2f}")
-        print(f"   총 비트 합계: {total_bits}")
+        print(f"   최소 비트 수: {stats.min_bits}")
+        print(f"   최대 비트 수: {stats.max_bits}")
+        print(f"   평균 비트 수: {stats.avg_bits:.2f}")
+        print(f"   총 비트 합계: {stats.total_bits}")
         
         print(f"\n📈 정규화 값 (MIN-MAX Normalization):")
         print(f"   공식: (값 - MIN) / (MAX - MIN)")
-        for i, (item, norm) in enumerate(zip(self.voynich_codes[:10], normalized[:10]), 1):
-            print(f"   {i:2d}. '{item['char']}' (번호:{item['number']:2d}) → 정규화: {norm:.4f}")
-        if len(normalized) > 10:
-            print(f"   ... (총 {len(normalized)}개)")
+        for i, (item, norm) in enumerate(zip(self.voynich_codes[:10], stats.normalized[:10]), 1):
+            print(f"   {i:2d}. '{item.char}' (번호:{item.number:2d}) → 정규화: {norm:.4f}")
+        if stats.count > 10:
+            print(f"   ... (총 {stats.count}개)")
         
         print(f"\n🎯 전체 텍스트 시그니처:")
-        print(f"   문자 수: {len(self.voynich_codes)}")
-        print(f"   고유 문자: {len(self.converter.char_to_number)}개")
-        print(f"   숫자 패턴: {numbers[:15]}..." if len(numbers) > 15 else f"   숫자 패턴: {numbers}")
-        print(f"   비트 시그니처: {total_bits}")
-        print(f"   복잡도 지수: {total_bits / len(numbers):.2f}")
+        print(f"   문자 수: {stats.count}")
+        print(f"   고유 문자: {stats.unique_chars}개")
+        print(f"   숫자 패턴: {numbers[:15].tolist()}..." if stats.count > 15 else f"   숫자 패턴: {numbers.tolist()}")
+        print(f"   비트 시그니처: {stats.total_bits}")
+        print(f"   복잡도 지수: {stats.complexity:.2f}")
         
         # 빈도수 분석
-        from collections import Counter
-        freq = Counter(numbers)
         print(f"\n📊 빈도수 분석 (상위 5개):")
-        for num, count in freq.most_common(5):
+        for num, count in stats.frequencies[:5]:
             char = self.converter.number_to_char[num]
-            percentage = (count / len(numbers)) * 100
+            percentage = (count / stats.count) * 100
             print(f"   '{char}' (번호:{num}) → {count}회 ({percentage:.1f}%)")
     
     def get_unique_chars(self):
@@ -172,7 +250,37 @@ class LanguageMatcher:
         self.analyzer = voynich_analyzer
         self.converter = voynich_analyzer.converter
         self.language_database = {}
+        self.features = None  # 공유 메모리에서 붙인 사전 특징 배열 (DictionaryFeatures)
+        self._feature_rows = []  # features의 (언어, 단어, max, min, 크기) 행
         self.word_cache = {}  # 캐싱 추가
+
+    @classmethod
+    def from_features(cls, voynich_analyzer, features):
+        """미리 계산된 사전 특징 배열로 매칭기 생성 (add_language_words 재계산 없음)"""
+        matcher = cls(voynich_analyzer)
+        matcher.features = features
+        # 스칼라 열은 매칭기마다 한 번만 리스트로 읽는다 (코드 행은 공유 메모리의 뷰로 남음)
+        languages = [features.languages[index] for index in features.language.tolist()]
+        matcher._feature_rows = list(zip(
+            languages, features.words, features.nb_max.tolist(), features.nb_min.tolist(), features.norms.tolist()
+        ))
+        return matcher
+
+    def feature_store(self):
+        """적재된 사전을 DictionaryFeatures 열 배열로 변환 (publish()로 공유 가능)"""
+        from dictionary_features import DictionaryFeatures
+        return DictionaryFeatures.from_database(self.language_database)
+
+    def _candidates(self):
+        """사전 단어 순회: (언어, 단어, 유니코드 배열, max, min, 배열 크기)"""
+        for language, words in self.language_database.items():
+            for word_data in words:
+                yield language, word_data['word'], word_data['unicode'], word_data['max'], word_data['min'], None
+        features = self.features
+        if features is None:
+            return
+        for index, (language, word, word_max, word_min, word_norm) in enumerate(self._feature_rows):
+            yield language, word, features.codes_of(index), word_max, word_min, word_norm
         
     def add_language_words(self, language, words):
         """언어별 단어 추가 (사전 계산 포함)"""
@@ -208,61 +316,54 @@ class LanguageMatcher:
         voynich_len = len(voynich_word)
         
         vec1 = [float(x) for x in voynich_unicode]
+        norm1 = math.sqrt(sum(a * a for a in vec1))
         
         matches = []
         
-        for language, words in self.language_database.items():
-            for word_data in words:
-                word = word_data['word']
-                
-                # 빠른 필터링: 길이 차이가 너무 크면 스킵
-                len_diff = abs(len(word) - voynich_len)
-                if len_diff > max(len(word), voynich_len) * 0.5:
-                    continue
-                
-                # 사전 계산된 값 사용
-                word_unicode = word_data['unicode']
-                word_max = word_data['max']
-                word_min = word_data['min']
-                
-                # 1. 비트 값 유사도 (빠른 계산)
-                bit_similarity = word_sim(voynich_max, voynich_min, word_max, word_min)
-                
-                # 빠른 필터: 비트 유사도가 너무 낮으면 스킵
-                if bit_similarity < 30:
-                    continue
-                
-                # 2. 코사인 유사도
-                vec2 = [float(x) for x in word_unicode]
-                cosine_sim = cosine_similarity(vec1, vec2) * 100
-                
-                # 3. Levenshtein 거리 (간단한 계산)
-                max_len = max(len(voynich_word), len(word))
-                lev_distance = levenshtein(voynich_word, word)
-                lev_similarity = ((max_len - lev_distance) / max_len) * 100 if max_len > 0 else 0
-                
-                # 간소화된 종합 유사도 (3가지만 사용)
-                final_similarity = (
-                    bit_similarity * 0.40 +
-                    cosine_sim * 0.40 +
-                    lev_similarity * 0.20
-                ) / 100
-                
-                if final_similarity >= threshold:
-                    matches.append({
-                        'language': language,
-                        'word': word,
-                        'similarity': final_similarity,
-                        'details': {
-                            'bit_sim': bit_similarity / 100,
-                            'cosine': cosine_sim / 100,
-                            'levenshtein': lev_similarity / 100,
-                            'voynich_max': voynich_max,
-                            'voynich_min': voynich_min,
-                            'word_max': word_max,
-                            'word_min': word_min,
-                        }
-                    })
+        for language, word, word_unicode, word_max, word_min, word_norm in self._candidates():
+            # 빠른 필터링: 길이 차이가 너무 크면 스킵
+            len_diff = abs(len(word) - voynich_len)
+            if len_diff > max(len(word), voynich_len) * 0.5:
+                continue
+            
+            # 1. 비트 값 유사도 (빠른 계산)
+            bit_similarity = word_sim(voynich_max, voynich_min, word_max, word_min)
+            
+            # 빠른 필터: 비트 유사도가 너무 낮으면 스킵
+            if bit_similarity < 30:
+                continue
+            
+            # 2. 코사인 유사도
+            vec2 = [float(x) for x in word_unicode]
+            cosine_sim = cosine_similarity(vec1, vec2, norm1, word_norm) * 100
+            
+            # 3. Levenshtein 거리 (간단한 계산)
+            max_len = max(len(voynich_word), len(word))
+            lev_distance = levenshtein(voynich_word, word)
+            lev_similarity = ((max_len - lev_distance) / max_len) * 100 if max_len > 0 else 0
+            
+            # 간소화된 종합 유사도 (3가지만 사용)
+            final_similarity = (
+                bit_similarity * 0.40 +
+                cosine_sim * 0.40 +
+                lev_similarity * 0.20
+            ) / 100
+            
+            if final_similarity >= threshold:
+                matches.append({
+                    'language': language,
+                    'word': word,
+                    'similarity': final_similarity,
+                    'details': {
+                        'bit_sim': bit_similarity / 100,
+                        'cosine': cosine_sim / 100,
+                        'levenshtein': lev_similarity / 100,
+                        'voynich_max': voynich_max,
+                        'voynich_min': voynich_min,
+                        'word_max': word_max,
+                        'word_min': word_min,
+                    }
+                })
         
         # 유사도 순으로 정렬
         matches.sort(key=lambda x: x['similarity'], reverse=True)
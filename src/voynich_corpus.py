@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""\
+Memory-mapped access to the Voynich transcription with a cached line/token index.
+
+The corpus file is mapped read-only and never decoded as a whole. On first use
+an index of line start offsets, token byte ranges (for a given token pattern)
+and folio markers is built in one pass and saved under .cache/corpus_index;
+later runs load the index and read only the lines or tokens they ask for.
+The index is rebuilt when the file's size or modification time changes.
+
+Folio markers are transcription locus tags at the start of a line, e.g.
+``<f1r>`` or ``<f1r.P.1;H>``. The bundled data/voynich.nowhitespace.txt has
+none, so folio access is only available for transcriptions that carry them.
+
+Token patterns:
+    TOKEN_PATTERN           ``\\w+`` (the n/b JSON pipeline)
+    ANALYZER_TOKEN_PATTERN  runs of 2+ characters between spaces and , ! ? . ; :
+                            (the same tokens as analyze_full_voynich.split_voynich_text)
+
+Example:
+    python src/voynich_corpus.py --info
+    python src/voynich_corpus.py --lines 10:12
+    python src/voynich_corpus.py --tokens 100:110
+    python src/voynich_corpus.py --folio f1r
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CORPUS_PATH = ROOT_DIR / "data" / "voynich.nowhitespace.txt"
+INDEX_DIR = ROOT_DIR / ".cache" / "corpus_index"
+
+TOKEN_PATTERN = r"\w+"
+ANALYZER_TOKEN_PATTERN = r"[^,!?\.\;\:\s]{2,}"
+FOLIO_PATTERN = re.compile(r"^<(f\d+[rv]\d*)(?:[.;,][^>]*)?>")
+
+MAGIC = b"VNBCORPX"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _resolve(path: str | Path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else ROOT_DIR / path
+
+
+class CorpusIndex:
+    """Byte offsets of lines and tokens plus folio start lines."""
+
+    def __init__(
+        self,
+        line_offsets: array,
+        token_starts: array,
+        token_ends: array,
+        line_tokens: array,
+        folios: Dict[str, int],
+    ) -> None:
+        self.line_offsets = line_offsets  # line i spans [line_offsets[i], line_offsets[i + 1])
+        self.token_starts = token_starts
+        self.token_ends = token_ends
+        self.line_tokens = line_tokens  # tokens of line i are [line_tokens[i], line_tokens[i + 1])
+        self.folios = folios  # folio name -> first line
+
+    @classmethod
+    def build(cls, data: mmap.mmap | bytes, pattern: str) -> "CorpusIndex":
+        """Scan the corpus once, line by line"""
+        token_re = re.compile(pattern)
+        line_offsets = array("Q", [0])
+        token_starts = array("Q")
+        token_ends = array("Q")
+        line_tokens = array("Q", [0])
+        folios: Dict[str, int] = {}
+        size = len(data)
+        position = 0
+        line_number = 0
+        while position < size:
+            end = data.find(b"\n", position)
+            end = size if end < 0 else end + 1
+            text = data[position:end].decode("utf-8")
+            marker = FOLIO_PATTERN.match(text)
+            char_at = 0
+            if marker:
+                folios.setdefault(marker.group(1), line_number)
+                char_at = marker.end()  # the locus tag is not text
+            # Convert character offsets to byte offsets incrementally
+            byte_at = position + len(text[:char_at].encode("utf-8"))
+            for match in token_re.finditer(text, char_at):
+                byte_at += len(text[char_at:match.start()].encode("utf-8"))
+                token_starts.append(byte_at)
+                byte_at += len(match.group().encode("utf-8"))
+                token_ends.append(byte_at)
+                char_at = match.end()
+            line_offsets.append(end)
+            line_tokens.append(len(token_starts))
+            position = end
+            line_number += 1
+        return cls(line_offsets, token_starts, token_ends, line_tokens, folios)
+
+    def save(self, path: Path, key: Dict[str, object]) -> None:
+        header = json.dumps(
+            {
+                "key": key,
+                "lines": len(self.line_offsets) - 1,
+                "tokens": len(self.token_starts),
+                "folios": self.folios,
+            }
+        ).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+                handle.write(header)
+                for column in (self.line_offsets, self.line_tokens, self.token_starts, self.token_ends):
+                    column.tofile(handle)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    @classmethod
+    def load(cls, path: Path, key: Dict[str, object]) -> "CorpusIndex | None":
+        """Load a saved index; None if it is missing, corrupt or for another file state"""
+        try:
+            with path.open("rb") as handle:
+                magic, version, header_len = _PREAMBLE.unpack(handle.read(_PREAMBLE.size))
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    return None
+                header = json.loads(handle.read(header_len).decode("utf-8"))
+                if header.get("key") != key:
+                    return None
+                columns = []
+                for count in (header["lines"] + 1, header["lines"] + 1, header["tokens"], header["tokens"]):
+                    column = array("Q")
+                    column.fromfile(handle, count)
+                    columns.append(column)
+        except (OSError, ValueError, EOFError, struct.error):
+            return None
+        line_offsets, line_tokens, token_starts, token_ends = columns
+        return cls(line_offsets, token_starts, token_ends, line_tokens, header["folios"])
+
+
+class VoynichCorpus:
+    """Random access to corpus lines, tokens and folios without reading the whole file."""
+
+    def __init__(
+        self,
+        path: str | Path = CORPUS_PATH,
+        pattern: str = TOKEN_PATTERN,
+        index_dir: str | Path | None = INDEX_DIR,
+    ) -> None:
+        self.path = _resolve(path)
+        self.pattern = pattern
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            # mmap cannot map an empty file
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+
+        key = {
+            "path": str(self.path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "pattern": pattern,
+        }
+        index_path = None
+        if index_dir is not None:
+            # One index file per corpus and pattern; a changed file overwrites it
+            digest = hashlib.sha256(f"{self.path}\0{pattern}".encode("utf-8")).hexdigest()[:16]
+            index_path = _resolve(index_dir) / f"{self.path.stem}-{digest}.idx"
+        self.index = CorpusIndex.load(index_path, key) if index_path else None
+        self.index_cached = self.index is not None
+        if self.index is None:
+            self.index = CorpusIndex.build(self._map, pattern)
+            if index_path is not None:
+                try:
+                    self.index.save(index_path, key)
+                except OSError as exc:
+                    print(f"WARNING: corpus index not cached: {exc}")
+
+    @property
+    def line_count(self) -> int:
+        return len(self.index.line_offsets) - 1
+
+    @property
+    def token_count(self) -> int:
+        return len(self.index.token_starts)
+
+    def _decode(self, start: int, end: int) -> str:
+        return self._map[start:end].decode("utf-8")
+
+    def line(self, number: int) -> str:
+        """Line text without its line break"""
+        if number < 0:
+            number += self.line_count
+        if not 0 <= number < self.line_count:
+            raise IndexError("line index out of range")
+        offsets = self.index.line_offsets
+        return self._decode(offsets[number], offsets[number + 1]).rstrip("\r\n")
+
+    def lines(self, start: int = 0, stop: int | None = None) -> List[str]:
+        return [self.line(number) for number in range(*slice(start, stop).indices(self.line_count))]
+
+    def token(self, number: int) -> str:
+        if number < 0:
+            number += self.token_count
+        if not 0 <= number < self.token_count:
+            raise IndexError("token index out of range")
+        return self._decode(self.index.token_starts[number], self.index.token_ends[number])
+
+    def iter_tokens(self, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        starts, ends = self.index.token_starts, self.index.token_ends
+        for number in range(*slice(start, stop).indices(self.token_count)):
+            yield self._decode(starts[number], ends[number])
+
+    def tokens(self, start: int = 0, stop: int | None = None) -> List[str]:
+        """Tokens [start, stop) in corpus order"""
+        return list(self.iter_tokens(start, stop))
+
+    def token_line(self, number: int) -> int:
+        """Line that holds token ``number``"""
+        return bisect_right(self.index.line_tokens, number) - 1
+
+    def line_token_range(self, start: int, stop: int | None = None) -> Tuple[int, int]:
+        """Token index range [first, last) covered by lines [start, stop)"""
+        start, stop, _ = slice(start, stop).indices(self.line_count)
+        return self.index.line_tokens[start], self.index.line_tokens[max(start, stop)]
+
+    def folios(self) -> List[str]:
+        return list(self.index.folios)
+
+    def folio_lines(self, name: str) -> Tuple[int, int]:
+        """Line range [first, last) of a folio, up to the next folio marker"""
+        if name not in self.index.folios:
+            raise KeyError(f"no folio marker {name!r} in {self.path.name}")
+        first = self.index.folios[name]
+        following = [line for line in self.index.folios.values() if line > first]
+        return first, min(following, default=self.line_count)
+
+    def folio_tokens(self, name: str) -> List[str]:
+        return self.tokens(*self.line_token_range(*self.folio_lines(name)))
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    def __enter__(self) -> "VoynichCorpus":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect the Voynich corpus through its cached index")
+    parser.add_argument("--input", default=str(CORPUS_PATH), help="Corpus text file")
+    parser.add_argument("--pattern", default=TOKEN_PATTERN, help="Token regular expression")
+    parser.add_argument("--info", action="store_true", help="Print line, token and folio counts")
+    parser.add_argument("--lines", default=None, help="Print lines START:STOP")
+    parser.add_argument("--tokens", default=None, help="Print tokens START:STOP")
+    parser.add_argument("--folio", default=None, help="Print the tokens of a folio")
+    args = parser.parse_args()
+
+    def bounds(text: str) -> Tuple[int, int | None]:
+        start, _, stop = text.partition(":")
+        return int(start or 0), int(stop) if stop else None
+
+    with VoynichCorpus(args.input, args.pattern) as corpus:
+        if args.info or not (args.lines or args.tokens or args.folio):
+            print(f"File: {corpus.path}")
+            print(f"Lines: {corpus.line_count}")
+            print(f"Tokens: {corpus.token_count}")
+            print(f"Folios: {len(corpus.folios())}")
+            print(f"Index: {'cached' if corpus.index_cached else 'built'}")
+        if args.lines:
+            for line in corpus.lines(*bounds(args.lines)):
+                print(line)
+        if args.tokens:
+            print(" ".join(corpus.tokens(*bounds(args.tokens))))
+        if args.folio:
+            try:
+                print(" ".join(corpus.folio_tokens(args.folio)))
+            except KeyError as exc:
+                print(f"ERROR: {exc.args[0]}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,9 @@
 # -*- coding: utf-8 -*-
 """
-Generate HTML page from voynich_to_english_sentence.txt using GPT AI.
+Generate HTML page from the Voynich match artifact using GPT AI.
 
 This script:
-1. Reads the English sentence and Korean translation from voynich_to_english_sentence.txt
+1. Reads the English sentence and Korean translation from the match artifact
 2. Uses GPT to generate a narrative interpretation for each word/phrase
 3. Adds Naver search links with contextual queries (full summary + keyword)
 4. Outputs formatted HTML
@@ -11,202 +11,176 @@ This script:
 
 from __future__ import annotations
 
-import json
-import os
-import time
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict
 
+from instrumentation import RunReport
+from llm_client import LLMClient, LLMError, get_default_client
+from match_artifact import ARTIFACT_PATH, load_match_artifact
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 
 
-def load_voynich_translation(filepath: str) -> Dict[str, str]:
-    """Load English sentence and Korean translation from file"""
-    file_path = Path(filepath)
-    if not file_path.is_absolute():
-        file_path = ROOT_DIR / file_path
-    
-    with file_path.open("r", encoding="utf-8") as handle:
-        content = handle.read()
-    
-    # Parse the file
-    lines = content.split("\n")
-    result = {
-        "english_sentence": "",
-        "korean_translation": "",
-        "details": []
-    }
-    
-    in_sentence = False
-    in_translation = False
-    in_details = False
-    
-    for i, line in enumerate(lines):
-        if line.startswith("Sentence:"):
-            in_sentence = True
-            in_translation = False
-            in_details = False
-            continue
-        elif line.startswith("GPT Translation"):
-            in_sentence = False
-            in_translation = True
-            in_details = False
-            continue
-        elif line.startswith("Details:"):
-            in_sentence = False
-            in_translation = False
-            in_details = True
-            continue
-        
-        if in_sentence and line.strip():
-            result["english_sentence"] += line.strip() + " "
-        elif in_translation and line.strip():
-            result["korean_translation"] += line.strip() + " "
-        elif in_details and line.strip() and "\t" in line:
-            parts = line.split("\t")
-            if len(parts) >= 2:
-                result["details"].append({
-                    "voynich": parts[0].strip(),
-                    "english": parts[1].strip(),
-                    "score": float(parts[2]) if len(parts) > 2 else 0
-                })
-    
-    result["english_sentence"] = result["english_sentence"].strip()
-    result["korean_translation"] = result["korean_translation"].strip()
-    
-    return result
+def load_voynich_translation(filepath: str = str(ARTIFACT_PATH)) -> Dict:
+    """Load English sentence, Korean translation and match pairs from the match artifact"""
+    artifact = load_match_artifact(filepath)
+    if artifact is None:
+        raise FileNotFoundError(filepath)
+    with artifact:
+        return {
+            "english_sentence": artifact.sentence.strip(),
+            "korean_translation": artifact.translation.strip(),
+            "pairs": list(artifact.pairs),
+        }
 
 
-def summarize_with_gpt(text: str, focus: str = "보이니치") -> str:
+def summarize_with_gpt(text: str, focus: str = "보이니치", client: LLMClient | None = None) -> str:
     """Generate a concise summary using GPT (max 30 chars for search query)"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if client is None:
+        client = get_default_client()
+    if not client.available:
         return focus
     
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are a concise Korean writer. Generate a very brief description (under 15 Korean characters) that captures the essence. Reply with ONLY the Korean description, no explanation."
-            },
-            {
-                "role": "user",
-                "content": f"Summarize in Korean: {text}"
-            }
-        ],
-        "temperature": 0.3,
-        "max_tokens": 30,
-    }
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a concise Korean writer. Generate a very brief description (under 15 Korean characters) that captures the essence. Reply with ONLY the Korean description, no explanation."
+        },
+        {
+            "role": "user",
+            "content": f"Summarize in Korean: {text}"
+        }
+    ]
     
     try:
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            "https://api.openai.com/v1/chat/completions",
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        
-        with urllib.request.urlopen(request, timeout=30) as response:
-            body = response.read().decode("utf-8")
-            parsed = json.loads(body)
-            if "choices" in parsed and parsed["choices"]:
-                summary = parsed["choices"][0]["message"]["content"].strip()
-                return summary[:15]
-    except Exception as e:
+        summary = client.chat(messages, temperature=0.3, max_tokens=30, timeout=30)
+        return summary[:15]
+    except LLMError:
         pass
     
     return focus
 
 
-def generate_narrative_with_gpt(korean_words: List[str], context: str = "") -> str:
+def generate_narrative_with_gpt(
+    korean_words: List[str],
+    context: str = "",
+    client: LLMClient | None = None,
+    verbose: bool = True,
+) -> str:
     """Generate a poetic narrative for the Korean words using GPT"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if client is None:
+        client = get_default_client()
+    if not client.available:
         words_str = " ".join(korean_words[:20])
         return f"이 구절은 {words_str}을(를) 담고 있습니다."
     
     words_str = " ".join(korean_words[:15])  # Use first 15 words
     
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are a poetic Korean writer interpreting ancient mystical texts. Generate a 2-3 sentence narrative description. Write in Korean only."
-            },
-            {
-                "role": "user",
-                "content": f"Create a poetic interpretation of these words: {words_str}"
-            }
-        ],
-        "temperature": 0.7,
-        "max_tokens": 100,
-    }
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a poetic Korean writer interpreting ancient mystical texts. Generate a 2-3 sentence narrative description. Write in Korean only."
+        },
+        {
+            "role": "user",
+            "content": f"Create a poetic interpretation of these words: {words_str}"
+        }
+    ]
     
     try:
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            "https://api.openai.com/v1/chat/completions",
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST",
-        )
-        
-        print(f"  > Calling GPT for: {words_str[:40]}...", end=" ", flush=True)
-        with urllib.request.urlopen(request, timeout=60) as response:
-            body = response.read().decode("utf-8")
-            parsed = json.loads(body)
-            if "choices" in parsed and parsed["choices"]:
-                narrative = parsed["choices"][0]["message"]["content"].strip()
-                print("✓")
-                return narrative
-        print("(no response)")
-    except urllib.error.HTTPError as e:
-        print(f"(HTTP {e.code})")
-        try:
-            error_body = e.read().decode("utf-8")
-            print(f"  Error: {error_body[:100]}")
-        except:
-            pass
-    except urllib.error.URLError as e:
-        print(f"(Network error: {str(e)[:50]})")
+        if verbose:
+            print(f"  > Calling GPT for: {words_str[:40]}...", end=" ", flush=True)
+        narrative = client.chat(messages, temperature=0.7, max_tokens=100, timeout=60)
+        if verbose:
+            print("✓")
+        return narrative
+    except LLMError as e:
+        if verbose:
+            if e.status is not None:
+                print(f"({e})")
+                if e.body:
+                    print(f"  Error: {e.body[:100]}")
+            else:
+                print(f"(Network error: {e.body[:50]})")
     except KeyboardInterrupt:
-        print("(cancelled by user)")
+        if verbose:
+            print("(cancelled by user)")
         raise
-    except (json.JSONDecodeError, ValueError, OSError, Exception) as e:
-        print(f"(Error: {type(e).__name__})")
     
     # Fallback to simple interpretation
     fallback = f"이 구절은 {words_str}의 신비로운 의미를 담고 있으며, 보이니치 원고의 중심 주제를 반영한다."
     return fallback
 
 
-def build_html_with_links(data: Dict, narratives: List[str] = None, chunks: List[List[str]] = None) -> str:
+def default_narrative(chunk: List[str]) -> str:
+    """Narrative used when GPT is unavailable or a chunk fails"""
+    return f"이 구절은 {' '.join(chunk[:3])}의 신비로운 의미를 담고 있다."
+
+
+def generate_narratives_parallel(
+    chunks: List[List[str]],
+    workers: int = 4,
+    client: LLMClient | None = None,
+) -> List[str]:
+    """Generate chunk narratives on a bounded worker pool, slotted back by chunk index"""
+    narratives: List[str | None] = [None] * len(chunks)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {
+        pool.submit(generate_narrative_with_gpt, chunk, "", client, False): idx
+        for idx, chunk in enumerate(chunks)
+    }
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            idx = futures[future]
+            try:
+                narratives[idx] = future.result()
+                status = "✓"
+            except Exception as e:
+                narratives[idx] = default_narrative(chunks[idx])
+                status = f"(Error: {type(e).__name__}, using default)"
+            print(f"[{done}/{len(chunks)}] section {idx + 1} {status}")
+    except KeyboardInterrupt:
+        print("\n(Cancelled by user)")
+        pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        pool.shutdown()
+
+    # Chunks that never finished keep a default interpretation
+    return [
+        narrative if narrative is not None else default_narrative(chunk)
+        for narrative, chunk in zip(narratives, chunks)
+    ]
+
+
+def summarize_parallel(
+    texts: List[str],
+    workers: int = 4,
+    client: LLMClient | None = None,
+    focus: str = "보이니치",
+) -> List[str]:
+    """Summarize texts for search link labels on a bounded worker pool, in input order"""
+    def summarize(text: str) -> str:
+        try:
+            return summarize_with_gpt(text, focus, client)
+        except Exception:
+            return focus
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(summarize, texts))
+
+
+def build_html_with_links(
+    data: Dict,
+    narratives: List[str] = None,
+    chunks: List[List[str]] = None,
+    summaries: List[str] = None,
+    workers: int = 4,
+) -> str:
     """Build HTML with Naver search links for each narrative section"""
     korean_words = data["korean_translation"].split()
     
-    # If narratives not provided, generate them
-    if narratives is None:
-        chunk_size = 12
-        chunks = [
-            korean_words[i:i + chunk_size]
-            for i in range(0, len(korean_words), chunk_size)
-        ]
-        narratives = []
-        for chunk in chunks:
-            narrative = generate_narrative_with_gpt(chunk)
-            narratives.append(narrative)
-    
     if chunks is None:
         chunk_size = 12
         chunks = [
@@ -214,6 +188,14 @@ def build_html_with_links(data: Dict, narratives: List[str] = None, chunks: List
             for i in range(0, len(korean_words), chunk_size)
         ]
     
+    # If narratives not provided, generate them
+    if narratives is None:
+        narratives = generate_narratives_parallel(chunks, workers)
+    
+    # Generate search query summaries (link labels) concurrently
+    if summaries is None:
+        summaries = summarize_parallel(narratives[:len(chunks)], workers)
+    
     # Build HTML
     html_content = f"""<!doctype html>
 <html lang="ko">
@@ -301,9 +283,7 @@ def build_html_with_links(data: Dict, narratives: List[str] = None, chunks: List
             chunk = chunks[i]
             keywords = " ".join(chunk[:3])  # First 3 words as keywords
             
-            # Generate search query summary
-            summary = summarize_with_gpt(narrative)
-            search_query = f"보이니치 해석 {summary}"
+            search_query = f"보이니치 해석 {summaries[i]}"
             
             # URL encode the search query
             encoded_query = urllib.parse.quote(search_query, safe='')
@@ -332,7 +312,7 @@ def build_html_with_links(data: Dict, narratives: List[str] = None, chunks: List
 
       <footer>
         <p>© 2026 Voynich Manuscript Analysis | Generated with GPT AI</p>
-        <p>Data source: outputs/voynich_to_english_sentence.txt</p>
+        <p>Data source: outputs/voynich_to_english_matches.bin (match artifact)</p>
       </footer>
     </main>
   </body>
@@ -351,14 +331,17 @@ def main() -> int:
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate HTML from Voynich translation using GPT AI")
-    parser.add_argument("--input", default="outputs/voynich_to_english_sentence.txt", help="Input translation file")
+    parser.add_argument("--input", default="outputs/voynich_to_english_matches.bin", help="Input match artifact")
     parser.add_argument("--output", default="voynich_interpretation.html", help="Output HTML file")
     parser.add_argument("--use-gpt", action="store_true", help="Use GPT for narrative generation (requires API)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent GPT requests")
     args = parser.parse_args()
+    report = RunReport("voynich_html_generator")
     
     # Load data
     print(f"Loading data from {args.input}...")
-    data = load_voynich_translation(args.input)
+    with report.stage("load"):
+        data = load_voynich_translation(args.input)
     
     if not data["korean_translation"]:
         print("ERROR: No Korean translation found in file")
@@ -378,34 +361,21 @@ def main() -> int:
     narratives = []
     
     if args.use_gpt:
-        print(f"Generating narrative with GPT AI ({len(chunks)} sections)...")
-        try:
-            for i, chunk in enumerate(chunks, 1):
-                print(f"[{i}/{len(chunks)}]", end=" ")
-                narrative = generate_narrative_with_gpt(chunk)
-                narratives.append(narrative)
-                # Add small delay between requests to avoid rate limiting
-                if i < len(chunks):
-                    time.sleep(0.5)
-        except KeyboardInterrupt:
-            print("\n(Cancelled by user)")
-            if len(narratives) == 0:
-                print("No narratives generated, using default interpretations")
-                narratives = None
+        print(f"Generating narrative with GPT AI ({len(chunks)} sections, {args.workers} workers)...")
+        with report.stage("narratives", items=len(chunks)):
+            narratives = generate_narratives_parallel(chunks, args.workers)
         print(f"\n✓ Generated {len(narratives)} narratives")
     
     # If no narratives generated, use defaults
     if not narratives:
         print("Generating default narratives...")
-        narratives = [
-            f"이 구절은 {' '.join(chunk[:3])}의 신비로운 의미를 담고 있다."
-            for chunk in chunks
-        ]
+        narratives = [default_narrative(chunk) for chunk in chunks]
         print(f"✓ Generated {len(narratives)} default narratives")
     
     # Generate HTML
     print("Building HTML...")
-    html_content = build_html_with_links(data, narratives, chunks[:len(narratives)])
+    with report.stage("render", items=len(narratives)):
+        html_content = build_html_with_links(data, narratives, chunks[:len(narratives)], workers=args.workers)
     
     # Save
     output_path = Path(args.output)
@@ -413,10 +383,14 @@ def main() -> int:
         output_path = ROOT_DIR / output_path
     
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
-        handle.write(html_content)
+    with report.stage("write"):
+        with output_path.open("w", encoding="utf-8") as handle:
+            handle.write(html_content)
     
     print(f"✓ HTML generated: {output_path}")
+    report.llm(get_default_client())
+    report.metric("html_chars", len(html_content))
+    report.write()
     return 0
 
 
@@ -5,6 +5,7 @@ Voynich n/b calculator (CLI)
 Examples:
     python src/voynich_nb_calculator.py --text "qokedy qokeedy"
     python src/voynich_nb_calculator.py --file data/voynich.nowhitespace.txt --limit 50
+    python src/voynich_nb_calculator.py --text "qokedy qokeedy" --nb-engine numpy
 """
 
 from __future__ import annotations
@@ -14,7 +15,7 @@ import sys
 from pathlib import Path
 from typing import Iterable, List
 
-from advanced_nb_calculator import BIT_MAX_NB, BIT_MIN_NB, word_nb_unicode_format
+from advanced_nb_calculator import BIT_MAX_NB, BIT_MIN_NB, engine_names, set_engine, word_nb_unicode_format
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 
@@ -64,8 +65,15 @@ def main() -> int:
     parser.add_argument("--file", help="Path to a text file")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of words to print")
     parser.add_argument("--show-codes", action="store_true", help="Print n/b code arrays")
+    parser.add_argument(
+        "--nb-engine",
+        choices=engine_names(),
+        default=None,
+        help="n/b engine (default: $NB_ENGINE or reference)",
+    )
 
     args = parser.parse_args()
+    set_engine(args.nb_engine)
 
     if not args.text and not args.file:
         try:
@@ -4,6 +4,7 @@ Split Voynich text into words and calculate n/b metrics to JSON.
 
 Example:
     python src/voynich_nb_words_to_json.py --input data/voynich.nowhitespace.txt
+    python src/voynich_nb_words_to_json.py --input data/voynich.nowhitespace.txt --nb-engine bisect
 """
 
 from __future__ import annotations
@@ -15,7 +16,16 @@ import re
 from pathlib import Path
 from typing import List, Dict
 
-from advanced_nb_calculator import BIT_MAX_NB, BIT_MIN_NB, word_nb_unicode_format
+from advanced_nb_calculator import (
+    BIT_MAX_NB,
+    BIT_MIN_NB,
+    bit_max_min_batch,
+    engine_names,
+    set_engine,
+    word_nb_unicode_format,
+)
+from instrumentation import RunReport
+from voynich_corpus import VoynichCorpus
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 OUTPUTS_DIR = ROOT_DIR / "outputs"
@@ -46,6 +56,16 @@ def calculate_nb(word: str) -> Dict[str, object]:
     }
 
 
+def calculate_nb_batch(words: List[str]) -> List[Dict[str, object]]:
+    """calculate_nb for many words through the engine's batch entry point"""
+    codes = [word_nb_unicode_format(word) for word in words]
+    metrics = bit_max_min_batch(codes)
+    return [
+        {"word": word, "length": len(word), "nb_max": nb_max, "nb_min": nb_min, "nb_codes": nb_codes}
+        for word, nb_codes, (nb_max, nb_min) in zip(words, codes, metrics)
+    ]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Voynich word split + n/b JSON generator")
     parser.add_argument("--input", required=True, help="Path to Voynich text file")
@@ -54,21 +74,31 @@ def main() -> int:
         default=str(OUTPUTS_DIR / "voynich_nb_words.json"),
         help="Output JSON path",
     )
+    parser.add_argument("--start", type=int, default=0, help="First token to process")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of words")
     parser.add_argument("--no-codes", action="store_true", help="Omit nb_codes from output")
+    parser.add_argument(
+        "--nb-engine",
+        choices=engine_names(),
+        default=None,
+        help="n/b engine (default: $NB_ENGINE or reference)",
+    )
     args = parser.parse_args()
-
-    text = load_text(args.input)
-    words = split_words(text)
-    if args.limit is not None:
-        words = words[: args.limit]
-
-    results = []
-    for word in words:
-        item = calculate_nb(word)
-        if args.no_codes:
+    report = RunReport("voynich_nb_words")
+    report.metric("nb_engine", set_engine(args.nb_engine).name)
+
+    # Read only the requested token range through the cached corpus index
+    with report.stage("tokenize") as stage:
+        with VoynichCorpus(args.input) as corpus:
+            stop = None if args.limit is None else args.start + args.limit
+            words = corpus.tokens(args.start, stop)
+        stage.add(len(words))
+
+    with report.stage("nb", items=len(words)):
+        results = calculate_nb_batch(words)
+    if args.no_codes:
+        for item in results:
             item.pop("nb_codes", None)
-        results.append(item)
 
     payload = {
         "source": args.input,
@@ -84,9 +114,11 @@ def main() -> int:
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    with output_path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=2)
+    with report.stage("write", items=len(results)):
+        with output_path.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
 
+    report.write()
     return 0
 
 